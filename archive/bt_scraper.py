@@ -11,6 +11,9 @@ from ..straits_times.st_scraper import ST_Scraper, process_txt_async
 import re
 from urllib.parse import urljoin, urlparse, parse_qs
 
+# one srcset candidate: URL (\S+), then optional whitespace+digits+w
+_SRCSET_PART_RE = re.compile(r'(\S+)(?:\s+(\d+)w)?')
+
 
 class BT_Scraper(ST_Scraper):
     async def scrape_single_url(self, url: str) -> Dict[str, Any]:
@@ -22,9 +25,10 @@ class BT_Scraper(ST_Scraper):
             return data
 
         # 2) fetch the DOM again so we can re-extract images
-        soup = await self._fetch_page_content(url)
-        if soup is None:
+        html = await self._fetch_html(url)
+        if html is None:
             return data
+        soup = BeautifulSoup(html, "lxml")
 
         article = soup.find("article")
         if article is None:
@@ -54,10 +58,7 @@ class BT_Scraper(ST_Scraper):
         Parse every <source>/@srcset and pick the URL with the largest 'w' value.
         Fallback to the <img>/@src if no valid srcset entries found.
         """
-        candidates = []  # list of (width:int, url:str)
-
-        # pattern:  capture URL (\S+), then optional whitespace+digits+w
-        pattern = re.compile(r'(\S+)(?:\s+(\d+)w)?')
+        best_w, best_url = -1, None
 
         for source in picture.find_all("source"):
             srcset = source.get("srcset", "")
@@ -65,25 +66,26 @@ class BT_Scraper(ST_Scraper):
                 part = part.strip()
                 if not part:
                     continue
-                m = pattern.match(part)
+                m = _SRCSET_PART_RE.match(part)
                 if not m:
                     continue
                 url_part, w_str = m.groups()
-                full_url = urljoin(page_url, url_part)
                 width = int(w_str) if w_str else 0
-                candidates.append((width, full_url))
-
-        # fallback to <img> if nothing valid in srcset
-        if not candidates:
+                # keep the widest candidate seen so far (first one wins ties)
+                if width > best_w:
+                    best_w, best_url = width, url_part
+
+        if best_url is not None:
+            best_url = urljoin(page_url, best_url)
+        else:
+            # fallback to <img> if nothing valid in srcset
             img = picture.find("img")
             if img and img.get("src"):
-                candidates.append((0, urljoin(page_url, img["src"])))
+                best_url = urljoin(page_url, img["src"])
 
-        if not candidates:
+        if best_url is None:
             return None
 
-        # pick the highest width
-        _, best_url = max(candidates, key=lambda x: x[0])
         img = picture.find("img")
         alt = img.get("alt", "").strip() or None if img else None
 
@@ -1,15 +1,28 @@
 import aiofiles                 # NEW  ──────── async file I/O
+import aiofiles.os
 from urllib.parse import urljoin
 from bs4 import BeautifulSoup, Tag
 from dateutil import parser as dateparser
 from typing import Any, Dict, List, Optional
 import asyncio, json, pathlib, traceback
+from contextlib import nullcontext
 from tqdm.auto import tqdm
-from openai import OpenAI
+import httpx
+import orjson
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from playwright.async_api import async_playwright, Browser, BrowserContext
 from ...utils.logger import logger  # Ensure this logger is configured
+from ...utils import aio
+import hashlib
 import random
 import re
+import time
+import uuid
+
+
+# publish-date fallbacks in scrape_single_url, built once instead of per article
+_PUBLISHED_RE = re.compile(r"\bPublished\b", re.IGNORECASE)
+_PUBLISHED_PREFIX_RE = re.compile(r"^[Pp]ublished[:·\s]*")
 
 
 class ST_Scraper:
@@ -19,16 +32,39 @@ class ST_Scraper:
         self, 
         llm_endpoint: str = "http://localhost:8124/v1", 
         model: str = "unsloth/Llama-3.2-3B-Instruct",
-        concurrency: int = 5
+        concurrency: int = 5,
+        llm_concurrency: int = 32,
+        summary_cache_dir: Optional[pathlib.Path] = None
     ):
-        self.llm_client = OpenAI(base_url=llm_endpoint, api_key="no-api-key-required")
+        # async client: summaries from many articles are in flight together, so
+        # the LLM server can batch them instead of seeing one request per thread
+        # the pool is sized to the semaphore so in-flight calls reuse keep-alive
+        # connections instead of queueing on httpx's default limits
+        self.llm_client = AsyncOpenAI(
+            base_url=llm_endpoint,
+            api_key="no-api-key-required",
+            max_retries=2,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=llm_concurrency * 2,
+                    max_keepalive_connections=llm_concurrency,
+                ),
+            ),
+        )
+        self.llm_semaphore = asyncio.Semaphore(llm_concurrency)
+        # summaries keyed by a hash of model + prompt + content, so retries and
+        # reprinted stories don't go back to the LLM
+        self.summary_cache_dir = pathlib.Path(summary_cache_dir) if summary_cache_dir else None
         self.model = model
         self.system_prompt = "You are a news summarization assistant. Provide a concise 100-word or less summary of the article content. Focus on key facts, events, and conclusions. Respond with the summary directly without saying anything else."
         self.concurrency = concurrency
         self.semaphore = asyncio.Semaphore(concurrency)
+        self.min_interval = 0.05
+        self._next_slot = 0.0
         self.browser: Optional[Browser] = None
         self.contexts: List[BrowserContext] = []
-        self.context_semaphore = asyncio.Semaphore(concurrency)
+        # idle contexts; each fetch takes one out and puts it back when done
+        self._ctx_pool: asyncio.Queue[BrowserContext] = asyncio.Queue()
 
     async def __aenter__(self):
         """Async context manager entry"""
@@ -56,6 +92,7 @@ class ST_Scraper:
                 ),
             )
             self.contexts.append(context)
+            self._ctx_pool.put_nowait(context)
         
         return self
 
@@ -69,6 +106,7 @@ class ST_Scraper:
             await self.browser.close()
         if self.playwright:
             await self.playwright.stop()
+        await self.llm_client.close()
 
     def _clean_content(self, article: Tag) -> str:
         """Extract and clean text content from article tag"""
@@ -79,20 +117,45 @@ class ST_Scraper:
             logger.warning("No text content extracted after cleaning.")
         return content
 
+    def _summary_cache_path(self, content: str) -> pathlib.Path:
+        h = hashlib.blake2b(digest_size=20)
+        for part in (self.model, self.system_prompt, content):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        key = h.hexdigest()
+        return self.summary_cache_dir / key[:2] / key
+
     async def _generate_summary(self, content: str) -> str:
+        cache_path = None
+        if self.summary_cache_dir is not None:
+            cache_path = self._summary_cache_path(content)
+            try:
+                async with aiofiles.open(cache_path, encoding="utf-8") as f:
+                    return await f.read()
+            except FileNotFoundError:
+                pass
+
         try:
-            # Run the blocking LLM call in a separate thread
-            response = await asyncio.to_thread(
-                self.llm_client.chat.completions.create,
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": f"{self.system_prompt}\nArticle contents:\n{content}"}
-                ],
-            )
-            return response.choices[0].message.content.strip()
+            async with self.llm_semaphore:
+                response = await self.llm_client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "user", "content": f"{self.system_prompt}\nArticle contents:\n{content}"}
+                    ],
+                )
+            summary = response.choices[0].message.content.strip()
         except Exception as e:
             logger.error(f"LLM summary generation error: {e}", exc_info=True)
             return f"Summary generation failed: {str(e)}"
+
+        if cache_path is not None:
+            # write-then-rename, so a concurrent reader never sees half a summary
+            await aiofiles.os.makedirs(cache_path.parent, exist_ok=True)
+            tmp = cache_path.with_name(f"{cache_path.name}.{uuid.uuid4().hex}.tmp")
+            async with aiofiles.open(tmp, "w", encoding="utf-8") as f:
+                await f.write(summary)
+            await aiofiles.os.replace(tmp, cache_path)
+        return summary
         
     def _extract_image_src(self, img_tag: Tag, page_url: str) -> Optional[str]:
         """
@@ -101,35 +164,45 @@ class ST_Scraper:
         src = img_tag.get("src") or img_tag.get("data-src") or img_tag.get("data-original")
         return urljoin(page_url, src) if src else None
 
-    async def _get_available_context(self) -> BrowserContext:
-        """Get an available browser context from the pool"""
-        async with self.context_semaphore:
-            # Simple round-robin selection
-            context_index = len(self.contexts) - self.context_semaphore._value - 1
-            return self.contexts[context_index % len(self.contexts)]
+    async def _wait_for_slot(self) -> None:
+        """
+        Space request starts min_interval apart. Each caller books the next free
+        start time up front (no lock, so no queue of waiters to wake in turn) and
+        sleeps until it; over any window the rate is exactly 1 / min_interval.
+        """
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.min_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
 
     async def _fetch_page_content(self, url: str) -> Optional[BeautifulSoup]:
         """Fetch page content using Playwright with context reuse"""
         if not self.browser:
             raise RuntimeError("Browser not started. Use 'async with'.")
         
+        # sleep out the rate-limit slot before taking a semaphore slot, so a
+        # waiting caller doesn't hold one of the concurrent fetches idle
+        await self._wait_for_slot()
         async with self.semaphore:
-            await asyncio.sleep(random.uniform(0.1, 0.75))
-            context = await self._get_available_context()
-            page = await context.new_page()
+            context = await self._ctx_pool.get()
+            page = None
             try:
+                page = await context.new_page()
                 await page.goto(url, wait_until="domcontentloaded", timeout=15000)  # Reduced timeout
                 await page.wait_for_selector("article", timeout=15000)
                 
                 html = await page.content()
                 logger.debug(f"Successfully fetched content from {url}")
-                return BeautifulSoup(html, "html.parser")
+                return BeautifulSoup(html, "lxml")
                 
             except Exception as e:
                 logger.error(f"Failed to fetch {url}: {e}")
                 return None
             finally:
-                await page.close()  # Close the page but keep context alive
+                if page is not None:
+                    await page.close()  # Close the page but keep context alive
+                self._ctx_pool.put_nowait(context)
 
     async def scrape_single_url(self, url: str) -> Dict[str, Any]:
         """Scrape a single URL for article content, metadata, images, and generate summary."""
@@ -172,11 +245,11 @@ class ST_Scraper:
                     pass
             else:
                 # 1) Look for <span>Published Thu, May 29, 2014 · 10:00 PM</span>
-                span = article.find("span", string=re.compile(r"\bPublished\b", re.IGNORECASE))
+                span = article.find("span", string=_PUBLISHED_RE)
                 if span:
                     raw = span.get_text(strip=True)
                     # remove leading "Published", optional colon/dot and whitespace
-                    cleaned = re.sub(r"^[Pp]ublished[:·\s]*", "", raw)
+                    cleaned = _PUBLISHED_PREFIX_RE.sub("", raw)
                     try:
                         pub_date = dateparser.parse(cleaned).isoformat()
                     except (ValueError, TypeError):
@@ -210,12 +283,11 @@ class ST_Scraper:
             images: List[Dict[str, Any]] = []
             
             for picture in article.find_all("picture"):
-                # grab alt text from the <img> if present
-                img_tag = picture.find("img")
-                alt = img_tag.get("alt", "").strip() or None if img_tag else None
+                # one walk of the picture's subtree; alt text comes from its first <img>
+                img_tags = picture.find_all("img")
+                alt = (img_tags[0].get("alt", "").strip() or None) if img_tags else None
 
-                # now pull every <source> and that <img>
-                for tag in picture.find_all(["img"]):
+                for tag in img_tags:
                     src = self._extract_image_src(tag, url)
                     if not src:
                         continue
@@ -241,11 +313,8 @@ class ST_Scraper:
         """Scrape multiple URLs concurrently"""
         logger.info(f"Starting batch scrape of {len(urls)} URLs")
         
-        tasks = []
-        for url in urls:
-            await asyncio.sleep(0.15)   # 200 ms between task-spawns
-            tasks.append(self.scrape_single_url(url))
-        results = await asyncio.gather(*tasks)
+        # the request rate is capped where pages are fetched, not at spawn time
+        results = await asyncio.gather(*(self.scrape_single_url(url) for url in urls))
         logger.info(f"Completed batch scrape of {len(urls)} URLs")
         return results
     
@@ -255,7 +324,8 @@ async def process_txt_async(
     out_dir: pathlib.Path,
     err_dir: pathlib.Path,
     concurrency: int = 5,
-    scraper_class: type=ST_Scraper
+    scraper_class: type=ST_Scraper,
+    scraper: Optional[ST_Scraper]=None
 ) -> str | None:
     year_month = txt_path.stem
     out_file = out_dir / f"{year_month}.jsonl"
@@ -265,7 +335,10 @@ async def process_txt_async(
 
     # ── 1) Read all URLs from the .txt ────────────────────────────────────────
     try:
-        urls = [ln.strip() for ln in txt_path.read_text().splitlines() if ln.strip()]
+        # sitemaps can list a URL more than once; keep first occurrences only
+        urls = list(dict.fromkeys(
+            u for u in (ln.strip() for ln in txt_path.read_text().splitlines()) if u
+        ))
     except Exception as e:
         logger.error(f"Error reading {txt_path}: {e}", exc_info=True)
         return None
@@ -277,13 +350,14 @@ async def process_txt_async(
     # ── 2) Filter out URLs we've already scraped successfully ───────────────
     processed_urls = set()
     if out_file.exists():
-        for line in out_file.read_text(encoding="utf-8").splitlines():
-            try:
-                rec = json.loads(line)
-                if isinstance(rec, dict) and "article_url" in rec:
-                    processed_urls.add(rec["article_url"])
-            except json.JSONDecodeError:
-                continue
+        with open(out_file, "rb") as f:
+            for line in f:
+                try:
+                    rec = orjson.loads(line)
+                    if isinstance(rec, dict) and "article_url" in rec:
+                        processed_urls.add(rec["article_url"])
+                except orjson.JSONDecodeError:
+                    continue
 
     # Keep only the ones not yet done
     urls = [u for u in urls if u not in processed_urls]
@@ -294,42 +368,62 @@ async def process_txt_async(
     # ── 3) Now urls contains only new entries; proceed as before ───────────
     success_count = error_count = 0
 
-    async with scraper_class(concurrency=concurrency) as scraper, \
-               aiofiles.open(out_file, "a", encoding="utf-8") as ok_f, \
-               aiofiles.open(err_file, "a", encoding="utf-8") as er_f:
+    # a scraper passed in is already open and owned by the caller
+    async with (nullcontext(scraper) if scraper is not None
+                else scraper_class(concurrency=concurrency)) as scraper, \
+               aiofiles.open(out_file, "ab") as ok_f, \
+               aiofiles.open(err_file, "ab") as er_f:
+
+        # records are batched per file and written in ~1 MB chunks, or every
+        # couple of seconds on slow files; a crash only loses the unwritten
+        # tail, which step 2 re-scrapes next run
+        bufs = {ok_f: bytearray(), er_f: bytearray()}
+        last_write = time.monotonic()
 
         # Kick off all scrapes
         scrape_tasks = [asyncio.create_task(scraper.scrape_single_url(u)) for u in urls]
 
-        # Wrap the completion iterator in tqdm
-        with tqdm(
-            total=len(scrape_tasks),
-            desc=f"Scraping URLs in {txt_path.name}",
-            unit="url",
-            leave=False
-        ) as pbar:
-            for coro in asyncio.as_completed(scrape_tasks):
-                item = await coro
-
-                # Determine which file to write to
-                is_error = isinstance(item, tuple) and item and item[0] == "ERROR"
-                target_f = er_f if is_error else ok_f
-
-                # Write & flush
-                await target_f.write(json.dumps(item, default=str) + "\n")
-                await target_f.flush()
-
-                # Logging and counters
-                if is_error:
-                    error_count += 1
-                    _, bad_url, msg, _tb = item
-                    logger.error(f"Error scraping {bad_url}: {msg}")
-                else:
-                    success_count += 1
-                    logger.debug(f"Saved {item['article_url']}")
-
-                # Advance the progress bar
-                pbar.update(1)
+        try:
+            # Wrap the completion iterator in tqdm
+            with tqdm(
+                total=len(scrape_tasks),
+                desc=f"Scraping URLs in {txt_path.name}",
+                unit="url",
+                leave=False
+            ) as pbar:
+                for coro in asyncio.as_completed(scrape_tasks):
+                    item = await coro
+
+                    # Determine which file to write to
+                    is_error = isinstance(item, tuple) and item and item[0] == "ERROR"
+                    target_f = er_f if is_error else ok_f
+
+                    buf = bufs[target_f]
+                    buf += orjson.dumps(item, default=str, option=orjson.OPT_APPEND_NEWLINE)
+                    if len(buf) >= 1 << 20 or time.monotonic() - last_write >= 2.0:
+                        for f, pending in bufs.items():
+                            if pending:
+                                await f.write(bytes(pending))
+                                await f.flush()
+                                pending.clear()
+                        last_write = time.monotonic()
+
+                    # Logging and counters
+                    if is_error:
+                        error_count += 1
+                        _, bad_url, msg, _tb = item
+                        logger.error(f"Error scraping {bad_url}: {msg}")
+                    else:
+                        success_count += 1
+                        logger.debug(f"Saved {item['article_url']}")
+
+                    # Advance the progress bar
+                    pbar.update(1)
+        finally:
+            for f, buf in bufs.items():
+                if buf:
+                    await f.write(bytes(buf))
+                    await f.flush()
 
     logger.info(
         f"Completed {txt_path.name}: {success_count} ok, {error_count} errors"
@@ -337,6 +431,47 @@ async def process_txt_async(
     return year_month
 
 
+async def main_async(
+    txt_files: List[pathlib.Path],
+    out_dir: pathlib.Path,
+    err_dir: pathlib.Path,
+    seen_dir: pathlib.Path,
+    concurrency: int,
+    file_parallel: int = 3,
+    summary_cache_dir: Optional[pathlib.Path] = None
+) -> None:
+    """
+    Scrape all files on one loop with one scraper (one browser launch, one LLM
+    client), at most file_parallel files at a time.
+    """
+    file_sem = asyncio.Semaphore(file_parallel)
+    pbar = tqdm(total=len(txt_files), desc="Processing urls")
+
+    async with ST_Scraper(concurrency=concurrency,
+                          summary_cache_dir=summary_cache_dir) as scraper:
+        async def run_one(txt_file: pathlib.Path) -> None:
+            async with file_sem:
+                try:
+                    result = await process_txt_async(txt_file, out_dir, err_dir,
+                                                     concurrency, scraper=scraper)
+                    if result:
+                        logger.info(f"Processed {txt_file.name} with result {result}")
+
+                    # Move processed file to seen directory
+                    seen_path = seen_dir / txt_file.name
+                    txt_file.rename(seen_path)
+
+                except Exception as e:
+                    logger.error(f"Error processing {txt_file}: {e}", exc_info=True)
+                finally:
+                    pbar.update(1)
+
+        try:
+            await asyncio.gather(*(run_one(f) for f in txt_files))
+        finally:
+            pbar.close()
+
+
 def main():
     BASE_DIR = pathlib.Path("/home/leeeefun681/volume/eefun/webscraping/sitemap/sitemap_scrape/data/straits_times")
     UNSEEN_DIR = BASE_DIR / "unseen"  # Original .txt files here
@@ -360,19 +495,8 @@ def main():
 
     logger.info(f"Found {len(txt_files)} files to process")
 
-    # Process files one by one (you can modify this to process multiple files concurrently if needed)
-    for txt_file in tqdm(txt_files, desc="Processing urls"):
-        try:
-            result = asyncio.run(process_txt_async(txt_file, OUT_DIR, ERR_DIR, CONCURRENCY, ST_Scraper))
-            if result:
-                logger.info(f"Processed {txt_file.name} with result {result}")
-            
-            # Move processed file to seen directory
-            seen_path = SEEN_DIR / txt_file.name
-            txt_file.rename(seen_path)
-            
-        except Exception as e:
-            logger.error(f"Error processing {txt_file}: {e}", exc_info=True)
+    aio.run(main_async(txt_files, OUT_DIR, ERR_DIR, SEEN_DIR, CONCURRENCY,
+                       summary_cache_dir=BASE_DIR / "summary_cache"))
 
     logger.info("All files processed!")
 
@@ -4,12 +4,19 @@ from urllib.parse import urljoin
 from bs4 import BeautifulSoup, Tag
 from dateutil import parser as dateparser
 from typing import Any, Dict, List, Optional
-import asyncio, json, pathlib, traceback
+import asyncio, pathlib, traceback
 from tqdm.auto import tqdm
 from playwright.async_api import async_playwright, Browser, BrowserContext
 from playwright.async_api import Error as PlaywrightError
 from ...utils.logger import logger          # make sure this logger is configured
+from ..straits_times.st_scraper import _dump_line
 import random, re, concurrent.futures, os, functools, gc
+import orjson
+
+# publish-date fallback, built once instead of per article
+_PUBLISHED_RE = re.compile(r"\bPublished\b", re.I)
+_PUBLISHED_PREFIX_RE = re.compile(r"^[Pp]ublished[:·\s]*")
+
 
 # ──────────────────────────────────────────────────────────────────────────────
 #  ST_Scraper with automatic browser "showers"
@@ -26,7 +33,8 @@ class ST_Scraper:
         self.semaphore = asyncio.Semaphore(concurrency)
         self.browser: Optional[Browser] = None
         self.contexts: List[BrowserContext] = []
-        self.context_semaphore = asyncio.Semaphore(concurrency)
+        # idle contexts; each fetch takes one out and puts it back when done
+        self._ctx_pool: asyncio.Queue[BrowserContext] = asyncio.Queue()
 
     # ── async context management ────────────────────────────────────────────
     async def __aenter__(self):
@@ -50,6 +58,7 @@ class ST_Scraper:
             ],
         )
         logger.info("Browser launched")
+        self._ctx_pool = asyncio.Queue()
         for _ in range(self.concurrency):
             ctx = await self.browser.new_context(
                 viewport={"width": 1920, "height": 1080},
@@ -60,6 +69,7 @@ class ST_Scraper:
                 ),
             )
             self.contexts.append(ctx)
+            self._ctx_pool.put_nowait(ctx)
         self._pages_processed = 0
 
     async def _shutdown_browser(self):
@@ -97,14 +107,6 @@ class ST_Scraper:
         )
         return urljoin(page_url, src) if src else None
 
-    async def _get_available_context(self) -> BrowserContext:
-        async with self.context_semaphore:
-            if not self.contexts:
-                logger.error("No browser contexts available!")
-                raise RuntimeError("No browser contexts available!")
-            idx = len(self.contexts) - self.context_semaphore._value - 1
-            return self.contexts[idx % len(self.contexts)]
-
     async def _fetch_page_content(
         self,
         url: str,
@@ -124,11 +126,15 @@ class ST_Scraper:
 
             async with self.semaphore:
                 await asyncio.sleep(random.uniform(0.05, 0.2))
-                context = await self._get_available_context()
-                page = await context.new_page()
+                # put the context back into the pool it came from; after a
+                # restart that's the old pool, dropped with the old browser
+                pool = self._ctx_pool
+                context = await pool.get()
+                page = None
                 response = None
 
                 try:
+                    page = await context.new_page()
                     response = await page.goto(
                         url,
                         wait_until="domcontentloaded",
@@ -145,7 +151,7 @@ class ST_Scraper:
 
                     await page.wait_for_selector("article", timeout=30_000)
                     html = await page.content()
-                    return BeautifulSoup(html, "html.parser")
+                    return BeautifulSoup(html, "lxml")
 
                 except RuntimeError as e:
                     msg = str(e).lower()
@@ -183,10 +189,12 @@ class ST_Scraper:
                     raise
 
                 finally:
-                    try:
-                        await page.close()
-                    except Exception:
-                        pass
+                    if page is not None:
+                        try:
+                            await page.close()
+                        except Exception:
+                            pass
+                    pool.put_nowait(context)
                     self._pages_processed += 1
                     if self._pages_processed >= self.pages_before_restart:
                         await self._restart_browser()
@@ -227,9 +235,9 @@ class ST_Scraper:
                 except Exception:
                     pass
             else:
-                span = article.find("span", string=re.compile(r"\bPublished\b", re.I))
+                span = article.find("span", string=_PUBLISHED_RE)
                 if span:
-                    cleaned = re.sub(r"^[Pp]ublished[:·\s]*", "", span.get_text(strip=True))
+                    cleaned = _PUBLISHED_PREFIX_RE.sub("", span.get_text(strip=True))
                     try:
                         pub_date = dateparser.parse(cleaned).isoformat()
                     except Exception:
@@ -245,9 +253,10 @@ class ST_Scraper:
             content = self._clean_content(article)
             images: List[Dict[str, Any]] = []
             for picture in article.find_all("picture"):
-                img_tag = picture.find("img")
-                alt = img_tag.get("alt", "").strip() or None if img_tag else None
-                for tag in picture.find_all(["img"]):
+                # one walk of the picture's subtree; alt text comes from its first <img>
+                img_tags = picture.find_all("img")
+                alt = (img_tags[0].get("alt", "").strip() or None) if img_tags else None
+                for tag in img_tags:
                     src = self._extract_image_src(tag, url)
                     if src:
                         images.append({"image_url": src, "alt_text": alt})
@@ -297,13 +306,14 @@ async def process_txt_async(
     # ── 2) Filter out URLs we've already scraped successfully ───────────────
     processed_urls = set()
     if out_file.exists():
-        for line in out_file.read_text(encoding="utf-8").splitlines():
-            try:
-                rec = json.loads(line)
-                if isinstance(rec, dict) and "article_url" in rec:
-                    processed_urls.add(rec["article_url"])
-            except json.JSONDecodeError:
-                continue
+        with open(out_file, "rb") as f:
+            for line in f:
+                try:
+                    rec = orjson.loads(line)
+                    if isinstance(rec, dict) and "article_url" in rec:
+                        processed_urls.add(rec["article_url"])
+                except orjson.JSONDecodeError:
+                    continue
 
     # Keep only the ones not yet done
     urls = [u for u in urls if u not in processed_urls]
@@ -315,8 +325,8 @@ async def process_txt_async(
     success_count = error_count = 0
 
     async with scraper_class(concurrency=concurrency, pages_before_restart=pages_before_restart) as scraper, \
-               aiofiles.open(out_file, "a", encoding="utf-8") as ok_f, \
-               aiofiles.open(err_file, "a", encoding="utf-8") as er_f:
+               aiofiles.open(out_file, "ab") as ok_f, \
+               aiofiles.open(err_file, "ab") as er_f:
 
         # Kick off all scrapes
         scrape_tasks = [asyncio.create_task(scraper.scrape_single_url(u)) for u in urls]
@@ -336,7 +346,7 @@ async def process_txt_async(
                 target_f = er_f if is_error else ok_f
 
                 # Write & flush
-                await target_f.write(json.dumps(item,  ensure_ascii=ensure_ascii, default=str) + "\n")
+                await target_f.write(_dump_line(item, ensure_ascii))
                 await target_f.flush()
 
                 # Logging and counters
@@ -369,7 +379,7 @@ def _run_one_file(txt_file: pathlib.Path,
         # do the actual scraping
         asyncio.run(
             process_txt_async(txt_file, out_dir, err_dir,
-                              concurrency, ST_Scraper)
+                              concurrency, ST_Scraper, ensure_ascii=False)
         )
         # move to seen/  (atomic rename)
         txt_file.rename(seen_dir / txt_file.name)
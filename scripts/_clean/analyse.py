@@ -1,22 +1,25 @@
 import os
-import json
+import orjson
+import xxhash
 from tabulate import tabulate
-import glob
 import re
+from bisect import bisect_left
+import functools
+from concurrent.futures import ProcessPoolExecutor
 
 def read_jsonl_urls(jsonl_files):
     urls = []
     for path in jsonl_files:
         if not os.path.exists(path):
             continue
-        with open(path, 'r', encoding='utf-8') as f:
+        with open(path, 'rb') as f:
             for line in f:
                 try:
-                    obj = json.loads(line.strip())
+                    obj = orjson.loads(line)
                     url = obj.get("article_url")
                     if url:
                         urls.append(url)
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     continue
     return urls
 
@@ -25,67 +28,107 @@ def read_error_urls(error_files):
     for path in error_files:
         if not os.path.exists(path):
             continue
-        with open(path, 'r', encoding='utf-8') as f:
+        with open(path, 'rb') as f:
             for line in f:
                 try:
-                    lst = json.loads(line.strip())
+                    lst = orjson.loads(line)
                     if isinstance(lst, list) and len(lst) > 1:
                         urls.append(lst[1])
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     continue
     return urls
 
+# trailing "_YYYY" of a file base name
+_YEAR_SUFFIX_RE = re.compile(r'_(\d{4})$')
+
 def extract_year(base):
-    match = re.search(r'_(\d{4})$', base)
+    match = _YEAR_SUFFIX_RE.search(base)
     if match:
         return int(match.group(1))
     return 0  # Put bases without a year at the start
 
+def _scan_jsonl(directory):
+    """Sorted names and paths of the .jsonl files in a directory, from one scandir."""
+    if not os.path.isdir(directory):
+        return [], []
+    with os.scandir(directory) as it:
+        entries = sorted((e.name, e.path) for e in it if e.name.endswith('.jsonl'))
+    return [name for name, _ in entries], [path for _, path in entries]
+
+def _with_prefix(scan, prefix):
+    """Paths whose name starts with prefix, i.e. what glob(f"{prefix}*.jsonl") returned."""
+    names, paths = scan
+    out = []
+    i = bisect_left(names, prefix)
+    while i < len(names) and names[i].startswith(prefix):
+        out.append(paths[i])
+        i += 1
+    return out
+
+def _summary_row(txt_file, jsonl_files, error_files, txt_dir):
+    base = txt_file[:-4]  # remove '.txt'
+
+    # Only counts are reported, so the sets hold 64-bit hashes of the URLs
+    # rather than the URL strings themselves
+    txt_path = os.path.join(txt_dir, txt_file)
+    txt_count = 0
+    txt_set = set()
+    with open(txt_path, 'rb') as f_txt:
+        for line in f_txt:
+            line = line.strip()
+            if line:
+                txt_count += 1
+                txt_set.add(xxhash.xxh64_intdigest(line))
+    txt_duplicates = txt_count - len(txt_set)
+
+    # Aggregate URLs from all jsonl files (shard + non-shard)
+    jsonl_urls = read_jsonl_urls(jsonl_files)
+    jsonl_set = {xxhash.xxh64_intdigest(u.encode("utf-8")) for u in jsonl_urls}
+    jsonl_duplicates = len(jsonl_urls) - len(jsonl_set)
+
+    # Aggregate URLs from all error files (shard + non-shard)
+    error_urls = read_error_urls(error_files)
+    error_set = {xxhash.xxh64_intdigest(u.encode("utf-8")) for u in error_urls}
+    error_duplicates = len(error_urls) - len(error_set)
+
+    # Calculate missing
+    accounted_for = jsonl_set.union(error_set)
+    unaccounted = txt_set - accounted_for
+
+    year = extract_year(base)
+    return [
+        year, base,
+        len(txt_set), len(jsonl_urls), len(error_urls),
+        len(unaccounted),
+        txt_duplicates, jsonl_duplicates, error_duplicates
+    ]
+
 def compare_txt_jsonl(txt_dir, jsonl_dir, errors_dir):
     txt_files = [f for f in os.listdir(txt_dir) if f.endswith('.txt')]
-    summary = []
-
-    for txt_file in txt_files:
-        base = txt_file[:-4]  # remove '.txt'
-
-        # Sharded and non-sharded jsonl
-        jsonl_pattern = os.path.join(jsonl_dir, f"{base}*.jsonl")
-        jsonl_files = [
-            f for f in glob.glob(jsonl_pattern)
-            if not f.endswith('_errors.jsonl')
-        ]
-
-        # Sharded and non-sharded errors
-        error_pattern = os.path.join(errors_dir, f"{base}*_errors.jsonl")
-        error_files = glob.glob(error_pattern)
-
-        txt_path = os.path.join(txt_dir, txt_file)
-        with open(txt_path, 'r', encoding='utf-8') as f_txt:
-            txt_urls = [line.strip() for line in f_txt if line.strip()]
-        txt_set = set(txt_urls)
-        txt_duplicates = len(txt_urls) - len(txt_set)
-
-        # Aggregate URLs from all jsonl files (shard + non-shard)
-        jsonl_urls = read_jsonl_urls(jsonl_files)
-        jsonl_set = set(jsonl_urls)
-        jsonl_duplicates = len(jsonl_urls) - len(jsonl_set)
-
-        # Aggregate URLs from all error files (shard + non-shard)
-        error_urls = read_error_urls(error_files)
-        error_set = set(error_urls)
-        error_duplicates = len(error_urls) - len(error_set)
-
-        # Calculate missing
-        accounted_for = jsonl_set.union(error_set)
-        unaccounted = txt_set - accounted_for
-
-        year = extract_year(base)
-        summary.append([
-            year, base,
-            len(txt_set), len(jsonl_urls), len(error_urls),
-            len(unaccounted),
-            txt_duplicates, jsonl_duplicates, error_duplicates
-        ])
+
+    # Sharded and non-sharded jsonl / errors: scan each directory once and
+    # look bases up by prefix, instead of two globs per txt file
+    jsonl_scan = _scan_jsonl(jsonl_dir)
+    error_scan = _scan_jsonl(errors_dir)
+    bases = [f[:-4] for f in txt_files]
+    jsonl_lists = [
+        [f for f in _with_prefix(jsonl_scan, b) if not f.endswith('_errors.jsonl')]
+        for b in bases
+    ]
+    error_lists = [
+        [f for f in _with_prefix(error_scan, b) if f.endswith('_errors.jsonl')]
+        for b in bases
+    ]
+
+    # one row per base; each is independent, so build them across cores
+    worker = functools.partial(_summary_row, txt_dir=txt_dir)
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        summary = list(ex.map(
+            worker,
+            txt_files,
+            jsonl_lists,
+            error_lists,
+        ))
 
     # Sort by year
     summary.sort(key=lambda x: x[0])
@@ -99,10 +142,11 @@ def compare_txt_jsonl(txt_dir, jsonl_dir, errors_dir):
 
 # Example usage
 
-outlet = "tabla"
+if __name__ == "__main__":
+    outlet = "tabla"
 
-compare_txt_jsonl(
-    txt_dir=f'/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/{outlet}/seen',
-    jsonl_dir=f'/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/{outlet}/scraped',
-    errors_dir=f'/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/{outlet}/unsuccessful'
-)
\ No newline at end of file
+    compare_txt_jsonl(
+        txt_dir=f'/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/{outlet}/seen',
+        jsonl_dir=f'/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/{outlet}/scraped',
+        errors_dir=f'/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/{outlet}/unsuccessful'
+    )
\ No newline at end of file
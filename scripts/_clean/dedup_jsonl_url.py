@@ -1,36 +1,75 @@
 import os
-import json
+import mmap
+import orjson
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _line_url(line):
+    """
+    Return the article_url of a raw JSONL line (bytes), or None. Raises
+    orjson.JSONDecodeError for a line that isn't complete JSON.
+    """
+    # always a real decode: a crash can cut a record off anywhere, even just
+    # after a "]}" inside a caption, and only parsing it tells the two apart.
+    # orjson takes microseconds per record, next to nothing beside the read
+    obj = orjson.loads(line)
+    url = obj.get("article_url") if isinstance(obj, dict) else None
+    return url.encode('utf-8') if url else None
+
+
+def iter_lines(path):
+    """Yield every line of a file as bytes (newline stripped), read via mmap."""
+    if os.path.getsize(path) == 0:
+        return  # mmap refuses empty files
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start, size = 0, len(mm)
+        while start < size:
+            end = mm.find(b'\n', start)
+            if end == -1:
+                end = size
+            yield mm[start:end]
+            start = end + 1
+
+
+def _dedup_one(filepath):
+    directory, filename = os.path.split(filepath)
+    seen_urls = set()
+    unique_lines = []
+
+    for line in iter_lines(filepath):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            url = _line_url(line)
+            if url and url not in seen_urls:
+                seen_urls.add(url)
+                unique_lines.append(line)
+        except orjson.JSONDecodeError:
+            print(f"Skipping invalid JSON line in {filename}: {line.decode('utf-8', 'replace')}")
+
+    # Write deduped data to new file in a single write
+    new_filename = filename.replace('.jsonl', '_deduped.jsonl')
+    new_filepath = os.path.join(directory, new_filename)
+    with open(new_filepath, 'wb') as f_out:
+        if unique_lines:
+            f_out.write(b'\n'.join(unique_lines) + b'\n')
+
+    print(f'Processed {filename}: {len(unique_lines)} unique URLs written to {new_filename}')
+
 
 def remove_duplicates_jsonl_by_url(directory):
-    for filename in os.listdir(directory):
-        if filename.endswith('.jsonl'):
-            filepath = os.path.join(directory, filename)
-            seen_urls = set()
-            unique_lines = []
-
-            with open(filepath, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        obj = json.loads(line)
-                        url = obj.get("article_url")
-                        if url and url not in seen_urls:
-                            seen_urls.add(url)
-                            unique_lines.append(line)
-                    except json.JSONDecodeError:
-                        print(f"Skipping invalid JSON line in {filename}: {line}")
-
-            # Write deduped data to new file
-            new_filename = filename.replace('.jsonl', '_deduped.jsonl')
-            new_filepath = os.path.join(directory, new_filename)
-            with open(new_filepath, 'w', encoding='utf-8') as f_out:
-                for unique_line in unique_lines:
-                    f_out.write(unique_line + '\n')
-
-            print(f'Processed {filename}: {len(unique_lines)} unique URLs written to {new_filename}')
+    with os.scandir(directory) as it:
+        filepaths = [
+            entry.path
+            for entry in it
+            if entry.name.endswith('.jsonl') and entry.is_file()
+        ]
+    # files are independent and decode-bound, so spread them across cores
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        list(ex.map(_dedup_one, filepaths))
 
 # Example usage
-directory_path = '/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/the_new_paper/lol'  # Replace with your folder path
-remove_duplicates_jsonl_by_url(directory_path)
+if __name__ == "__main__":
+    directory_path = '/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/the_new_paper/lol'  # Replace with your folder path
+    remove_duplicates_jsonl_by_url(directory_path)
@@ -1,6 +1,66 @@
 import os
 from collections import defaultdict
 import math
+import mmap
+import re
+import shutil
+from array import array
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from dedup_jsonl_url import iter_lines  # sibling script; _clean/ is run directly, not as a package
+
+
+_NON_BLANK_RE = re.compile(rb'\S')
+
+
+def _line_spans(mm):
+    """Start/end offsets (newline excluded) of every non-blank line in the map."""
+    starts, ends = array('q'), array('q')
+    start, size = 0, len(mm)
+    while start < size:
+        end = mm.find(b'\n', start)
+        if end == -1:
+            end = size
+        if _NON_BLANK_RE.search(mm, start, end):
+            starts.append(start)
+            ends.append(end)
+        start = end + 1
+    return starts, ends
+
+
+def _write_spans(fout, mv, starts, ends, lo, hi):
+    """Write lines lo..hi straight from the map, one write per contiguous run."""
+    size = len(mv)
+    j = lo
+    while j < hi:
+        k = j
+        # extend the run while the next kept line starts right after this newline
+        while k + 1 < hi and starts[k + 1] == ends[k] + 1:
+            k += 1
+        if ends[k] < size:
+            fout.write(mv[starts[j]:ends[k] + 1])
+        else:
+            # last line of the file had no trailing newline
+            fout.write(mv[starts[j]:ends[k]])
+            fout.write(b'\n')
+        j = k + 1
+
+
+def _copy_file(fin, fout, size):
+    """Append all `size` bytes of fin to fout."""
+    offset = 0
+    try:
+        # kernel-side copy; the URLs never pass through Python
+        while offset < size:
+            sent = os.sendfile(fout.fileno(), fin.fileno(), offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+    except (OSError, AttributeError):
+        # no os.sendfile (Windows), or none into a regular file on this
+        # platform/filesystem (macOS): copy the rest through Python instead
+        fin.seek(offset)
+        shutil.copyfileobj(fin, fout)
 
 
 def merge_txt_by_year(input_dir, output_dir=None):
@@ -21,16 +81,43 @@ def merge_txt_by_year(input_dir, output_dir=None):
     for key, files in files_by_group.items():
         files.sort()
         output_path = os.path.join(output_dir, f"{key}.txt")
-        with open(output_path, 'w', encoding='utf-8') as fout:
+        # unbuffered, so the newline writes land in order with sendfile's
+        with open(output_path, 'wb', buffering=0) as fout:
             for fname in files:
-                with open(os.path.join(input_dir, fname), 'r', encoding='utf-8') as fin:
-                    contents = fin.read()
-                    fout.write(contents)
-                    if not contents.endswith("\n"):
-                        fout.write("\n")
+                with open(os.path.join(input_dir, fname), 'rb') as fin:
+                    size = os.fstat(fin.fileno()).st_size
+                    _copy_file(fin, fout, size)
+                    if not size or os.pread(fin.fileno(), 1, size - 1) != b"\n":
+                        fout.write(b"\n")
         print(f"Merged {len(files)} files into {output_path}")
 
 
+def _merge_and_shard_group(key, files, input_dir, output_dir, shards):
+    files.sort()
+    all_lines = []
+    for fname in files:
+        for line in iter_lines(os.path.join(input_dir, fname)):
+            if line.strip():
+                all_lines.append(line + b'\n')
+
+    total_lines = len(all_lines)
+    print(f"Merging {len(files)} files for {key} → {total_lines} lines")
+
+    if shards == 1:
+        output_path = os.path.join(output_dir, f"{key}.jsonl")
+        with open(output_path, 'wb') as fout:
+            fout.write(b''.join(all_lines))
+        print(f"  → Wrote to {output_path}")
+    else:
+        lines_per_shard = math.ceil(total_lines / shards)
+        for i in range(shards):
+            shard_lines = all_lines[i * lines_per_shard : (i + 1) * lines_per_shard]
+            output_path = os.path.join(output_dir, f"{key}_part{i+1}.jsonl")
+            with open(output_path, 'wb') as fout:
+                fout.write(b''.join(shard_lines))
+            print(f"  → Wrote {len(shard_lines)} lines to {output_path}")
+
+
 def merge_and_shard_jsonl_by_year(input_dir, output_dir=None, shards=4):
     if output_dir is None:
         output_dir = input_dir
@@ -46,31 +133,15 @@ def merge_and_shard_jsonl_by_year(input_dir, output_dir=None, shards=4):
                 key = f"{prefix}_{year}"
                 files_by_group[key].append(fname)
 
-    for key, files in files_by_group.items():
-        files.sort()
-        all_lines = []
-        for fname in files:
-            with open(os.path.join(input_dir, fname), 'r', encoding='utf-8') as fin:
-                for line in fin:
-                    if line.strip():
-                        all_lines.append(line if line.endswith('\n') else line + '\n')
-
-        total_lines = len(all_lines)
-        print(f"Merging {len(files)} files for {key} → {total_lines} lines")
-
-        if shards == 1:
-            output_path = os.path.join(output_dir, f"{key}.jsonl")
-            with open(output_path, 'w', encoding='utf-8') as fout:
-                fout.writelines(all_lines)
-            print(f"  → Wrote to {output_path}")
-        else:
-            lines_per_shard = math.ceil(total_lines / shards)
-            for i in range(shards):
-                shard_lines = all_lines[i * lines_per_shard : (i + 1) * lines_per_shard]
-                output_path = os.path.join(output_dir, f"{key}_part{i+1}.jsonl")
-                with open(output_path, 'w', encoding='utf-8') as fout:
-                    fout.writelines(shard_lines)
-                print(f"  → Wrote {len(shard_lines)} lines to {output_path}")
+    # each year group is independent, so merge them in parallel
+    worker = functools.partial(
+        _merge_and_shard_group,
+        input_dir=input_dir,
+        output_dir=output_dir,
+        shards=shards,
+    )
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        list(ex.map(worker, files_by_group.keys(), files_by_group.values()))
 
 
 def merge_errors_jsonl_by_year(input_dir, output_dir=None):
@@ -91,11 +162,11 @@ def merge_errors_jsonl_by_year(input_dir, output_dir=None):
     for key, files in files_by_group.items():
         files.sort()
         output_path = os.path.join(output_dir, f"{key}_errors.jsonl")
-        with open(output_path, 'w', encoding='utf-8') as fout:
+        # 1 MB buffer so the many short error lines don't each cost a write()
+        with open(output_path, 'wb', buffering=1 << 20) as fout:
             for fname in files:
-                with open(os.path.join(input_dir, fname), 'r', encoding='utf-8') as fin:
-                    for line in fin:
-                        fout.write(line if line.endswith('\n') else line + '\n')
+                for line in iter_lines(os.path.join(input_dir, fname)):
+                    fout.write(line + b'\n')
         print(f"Merged {len(files)} files into {output_path}")
 
 
@@ -119,22 +190,29 @@ def shard_all_jsonl_files_in_dir(input_dir, output_dir=None, shards=4):
             file_path = os.path.join(input_dir, fname)
             base_name = fname[:-6]  # Remove ".jsonl", keep "prefix_year"
 
-            with open(file_path, 'r', encoding='utf-8') as fin:
-                lines = [line if line.endswith('\n') else line + '\n' for line in fin if line.strip()]
-
-            total_lines = len(lines)
-            if total_lines == 0:
+            if os.path.getsize(file_path) == 0:
                 print(f"Skipping empty file: {fname}")
                 continue
 
-            lines_per_shard = math.ceil(total_lines / shards)
-            for i in range(shards):
-                shard_lines = lines[i * lines_per_shard: (i + 1) * lines_per_shard]
-                shard_fname = f"{base_name}_part{i+1}.jsonl"
-                shard_path = os.path.join(output_dir, shard_fname)
-                with open(shard_path, 'w', encoding='utf-8') as fout:
-                    fout.writelines(shard_lines)
-                print(f"Sharded {len(shard_lines)} lines → {shard_path}")
+            with open(file_path, 'rb') as fin, \
+                    mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                    memoryview(mm) as mv:
+                starts, ends = _line_spans(mm)
+
+                total_lines = len(starts)
+                if total_lines == 0:
+                    print(f"Skipping empty file: {fname}")
+                    continue
+
+                lines_per_shard = math.ceil(total_lines / shards)
+                for i in range(shards):
+                    lo = min(i * lines_per_shard, total_lines)
+                    hi = min((i + 1) * lines_per_shard, total_lines)
+                    shard_fname = f"{base_name}_part{i+1}.jsonl"
+                    shard_path = os.path.join(output_dir, shard_fname)
+                    with open(shard_path, 'wb') as fout:
+                        _write_spans(fout, mv, starts, ends, lo, hi)
+                    print(f"Sharded {hi - lo} lines → {shard_path}")
 
 
 # merge_txt_by_year(
@@ -154,8 +232,9 @@ def shard_all_jsonl_files_in_dir(input_dir, output_dir=None, shards=4):
 #     "/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/straits_times/temp"
 # )
 
-shard_all_jsonl_files_in_dir(
-    "/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/zaobao/scraped",
-    "/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/zaobao/scraped/temp",
-    shards=4
-)
\ No newline at end of file
+if __name__ == "__main__":
+    shard_all_jsonl_files_in_dir(
+        "/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/zaobao/scraped",
+        "/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/zaobao/scraped/temp",
+        shards=4
+    )
\ No newline at end of file
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 
 import os
-import json
+import orjson
 import shutil
+from collections import deque
 
 # Configuration: set the directory and threshold here
 ERROR_DIR = "/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/tabla/unsuccessful"
@@ -13,14 +14,19 @@ SEEN = "/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/tabla/seen"
 
 def count_lists(obj):
     """
-    Recursively count the number of list instances in a JSON object.
+    Count the number of list instances in a JSON object.
+    Walks with an explicit stack, so deep nesting can't hit the recursion limit.
     """
-    if isinstance(obj, list):
-        return 1 + sum(count_lists(item) for item in obj)
-    elif isinstance(obj, dict):
-        return sum(count_lists(value) for value in obj.values())
-    else:
-        return 0
+    n = 0
+    stack = deque([obj])
+    while stack:
+        x = stack.pop()
+        if isinstance(x, list):
+            n += 1
+            stack.extend(x)
+        elif isinstance(x, dict):
+            stack.extend(x.values())
+    return n
 
 
 def process_file(filepath):
@@ -28,14 +34,13 @@ def process_file(filepath):
     Read a JSONL file and count the total number of lists across all records.
     """
     total_lists = 0
-    with open(filepath, 'r', encoding='utf-8') as f:
+    with open(filepath, 'rb') as f:
         for line in f:
-            line = line.strip()
-            if not line:
+            if line.isspace():
                 continue
             try:
-                data = json.loads(line)
-            except json.JSONDecodeError as e:
+                data = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
                 print(f"Warning: Skipping invalid JSON in {filepath}: {e}")
                 continue
             total_lists += count_lists(data)
@@ -47,11 +52,15 @@ def main():
     directory = ERROR_DIR
     threshold = THRESHOLD
 
-    # Iterate through JSONL files in the error directory
-    for filename in os.listdir(directory):
-        if not filename.lower().endswith('.jsonl'):
-            continue
-        filepath = os.path.join(directory, filename)
+    # Iterate through JSONL files in the error directory; the entries are
+    # collected up front because matching files are removed inside the loop
+    with os.scandir(directory) as it:
+        entries = [
+            entry for entry in it
+            if entry.name.lower().endswith('.jsonl') and entry.is_file()
+        ]
+    for entry in entries:
+        filename, filepath = entry.name, entry.path
         count = process_file(filepath)
         if count > threshold:
             # Derive the .txt filename and print it
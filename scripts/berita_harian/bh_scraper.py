@@ -1,5 +1,7 @@
 from ..business_times.bt_scraper import BT_Scraper, process_txt_async
+from ..straits_times.st_scraper import process_files_async
 from ...utils.logger import logger  # Ensure this logger is configured
+from ...utils import aio
 import asyncio, json, pathlib, traceback
 from tqdm.auto import tqdm
 
@@ -18,6 +20,7 @@ def main():
     ERR_DIR.mkdir(exist_ok=True, parents=True)
 
     CONCURRENCY = 3  # Increased from 5 - URLs processed concurrently per file
+    FILE_PARALLEL = 4  # .txt files in flight at once on the shared browser
 
     txt_files = list(UNSEEN_DIR.glob("*.txt"))
 
@@ -27,19 +30,10 @@ def main():
 
     logger.info(f"Found {len(txt_files)} files to process")
 
-    # Process files one by one (you can modify this to process multiple files concurrently if needed)
-    for txt_file in tqdm(txt_files, desc="Processing urls"):
-        try:
-            result = asyncio.run(process_txt_async(txt_file, OUT_DIR, ERR_DIR, CONCURRENCY, BT_Scraper))
-            if result:
-                logger.info(f"Processed {txt_file.name} with result {result}")
-            
-            # Move processed file to seen directory
-            seen_path = SEEN_DIR / txt_file.name
-            txt_file.rename(seen_path)
-            
-        except Exception as e:
-            logger.error(f"Error processing {txt_file}: {e}", exc_info=True)
+    # Process several files at once, all on one event loop sharing one browser
+    aio.run(process_files_async(txt_files, OUT_DIR, ERR_DIR, SEEN_DIR,
+                                    CONCURRENCY, FILE_PARALLEL, BT_Scraper,
+                                    bloom_path=BASE_DIR / "seen.bf"))
 
     logger.info("All files processed!")
 
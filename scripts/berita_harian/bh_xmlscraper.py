@@ -6,14 +6,42 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Iterable, List
 import httpx
-from bs4 import BeautifulSoup
+from lxml import etree
+from ..straits_times.xmlscraper import SitemapClientMixin, _iter_locs
 
 # match URLs ending in "?year=YYYY"
 YEAR_FEED_RE = re.compile(r"[?&]year=(\d{4})$")
+# year feeds only need the <loc> strings, so skip the XML parse entirely
+_LOC_RE = re.compile(rb'<loc>\s*([^<\s][^<]*?)\s*</loc>')
+# every page <loc> opening tag, prefixed or with attributes (not image:loc)
+_LOC_OPEN_RE = re.compile(rb'<(?!image:|video:)(?:[\w.-]+:)?loc[\s>]')
+# a <loc> holds XML text, so only XML's five entities can appear in it
+_XML_ENTITIES = {"&lt;": "<", "&gt;": ">", "&quot;": '"', "&apos;": "'", "&amp;": "&"}
+_XML_ENTITY_RE = re.compile("|".join(_XML_ENTITIES))
+
+
+def _loc_urls(content: bytes) -> Iterable[str]:
+    """
+    Every <loc> URL in a raw urlset. Plain <loc>text</loc> entries are read
+    with a regex; if any <loc> isn't in that form (CDATA, a namespace prefix,
+    attributes) the whole feed goes through the lxml parse instead.
+    """
+    raw = _LOC_RE.findall(content)
+    if len(raw) != sum(1 for _ in _LOC_OPEN_RE.finditer(content)):
+        return [url for url in _iter_locs(content, parent="url") if url]
+    urls = [url.decode("utf-8") for url in raw]
+    return [
+        _XML_ENTITY_RE.sub(_unescape_entity, url) if "&" in url else url
+        for url in urls
+    ]
+
+
+def _unescape_entity(m: re.Match) -> str:
+    return _XML_ENTITIES[m.group()]
 
 
 @dataclass
-class BH_XMLScraper:
+class BH_XMLScraper(SitemapClientMixin):
     index_url: str
     out_dir: Path | str = "./data/beritaharian"
     timeout: float = 15.0
@@ -26,40 +54,29 @@ class BH_XMLScraper:
         self.out_dir = Path(self.out_dir)
         self.out_dir.mkdir(parents=True, exist_ok=True)
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            year_feeds = await self._sitemap_links(client)
-            if not year_feeds:
-                print("No year feeds found.")
-                return
-
-            sem = asyncio.Semaphore(self.max_concurrency)
-            tasks = [
-                asyncio.create_task(self._process_year(url, client, sem))
-                for url in year_feeds
-            ]
-            await asyncio.gather(*tasks)
+        client = self._get_client()
+        year_feeds = await self._sitemap_links(client)
+        if not year_feeds:
+            print("No year feeds found.")
+            return
 
-    def dump(self):
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = None
-
-        if loop and loop.is_running():
-            return asyncio.create_task(self.dump_async())
-        else:
-            asyncio.run(self.dump_async())
+        sem = asyncio.Semaphore(self.max_concurrency)
+        tasks = [
+            asyncio.create_task(self._process_year(url, client, sem))
+            for url in year_feeds
+        ]
+        await asyncio.gather(*tasks)
 
     async def _sitemap_links(self, client: httpx.AsyncClient) -> List[str]:
         """Return only those sitemap URLs whose loc ends with ?year=YYYY."""
         resp = await client.get(self.index_url)
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.content, "xml")
+        root = etree.fromstring(resp.content)
 
         raw = [
-            loc.text.strip()
-            for loc in soup.find_all("loc")
-            if loc.parent.name == "sitemap"
+            (loc.text or "").strip()
+            for loc in root.iter("{*}loc")
+            if etree.QName(loc.getparent()).localname == "sitemap"
         ]
         # filter to only year feeds
         feeds: list[str] = []
@@ -74,8 +91,7 @@ class BH_XMLScraper:
         """Fetch one year-sitemap and yield each <loc> URL."""
         resp = await client.get(feed_url)
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.content, "xml")
-        return (loc.text.strip() for loc in soup.find_all("loc"))
+        return _loc_urls(resp.content)
 
     async def _process_year(
         self, feed_url: str, client: httpx.AsyncClient, sem: asyncio.Semaphore
@@ -97,7 +113,8 @@ class BH_XMLScraper:
             year = m.group(1)
             fname = f"{self.abbrev}_{year}.txt"
             outpath = self.out_dir / fname
-            outpath.write_text("\n".join(urls), encoding="utf-8")
+            # written in a thread so the other downloads keep going meanwhile
+            await asyncio.to_thread(outpath.write_text, "\n".join(urls), encoding="utf-8")
 
             print(f"{len(urls):4d} URLs · {outpath.name}")
             await asyncio.sleep(self.polite_delay)
@@ -0,0 +1,59 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Compiled srcset scan for BT_Scraper._best_image_from_picture.
+
+Build in place with `cythonize -i scripts/business_times/_srcset.pyx`;
+bt_scraper falls back to its regex version when this isn't built.
+"""
+from cpython.unicode cimport Py_UNICODE_ISSPACE
+
+
+cpdef tuple best_from_srcset(str srcset):
+    """
+    Return (width, url) of the widest candidate in a srcset attribute, or
+    (-1, None) if it has none. Candidates without a "<digits>w" descriptor
+    count as width 0 and the first one wins ties, same as _SRCSET_RE.
+    """
+    cdef Py_ssize_t n = len(srcset)
+    cdef Py_ssize_t i = 0, start, j
+    cdef Py_UCS4 c
+    cdef object width
+    cdef object best_w = -1
+    cdef object best_url = None
+
+    while i < n:
+        c = srcset[i]
+        if c == u',' or Py_UNICODE_ISSPACE(c):
+            i += 1
+            continue
+
+        # URL: run of non-space, non-comma characters
+        start = i
+        while i < n:
+            c = srcset[i]
+            if c == u',' or Py_UNICODE_ISSPACE(c):
+                break
+            i += 1
+        url = srcset[start:i]
+
+        # optional whitespace + digits + "w"
+        width = 0
+        j = i
+        while j < n and Py_UNICODE_ISSPACE(srcset[j]):
+            j += 1
+        if j > i:
+            start = j
+            while j < n and u'0' <= srcset[j] <= u'9':
+                j += 1
+            if j > start and j < n and srcset[j] == u'w':
+                width = int(srcset[start:j])
+
+        # skip any other descriptor up to the next comma
+        while i < n and srcset[i] != u',':
+            i += 1
+
+        if width > best_w:
+            best_w = width
+            best_url = url
+
+    return best_w, best_url
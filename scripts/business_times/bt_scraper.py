@@ -6,81 +6,84 @@ import asyncio, json, pathlib, traceback
 from tqdm.auto import tqdm
 from playwright.async_api import async_playwright, Browser, BrowserContext
 from ...utils.logger import logger  # Ensure this logger is configured
-from ..straits_times.st_scraper import ST_Scraper, process_txt_async
+from ...utils import aio
+from ..straits_times.st_scraper import ST_Scraper, process_txt_async, process_files_async, _resolve_url
 import re
-from urllib.parse import urljoin, urlparse, parse_qs
-import concurrent.futures, os, functools
 
+# one srcset candidate: URL, optional "<digits>w" width, then any other
+# descriptor (e.g. "2x") up to the next comma
+_SRCSET_RE = re.compile(r'([^\s,]+)(?:\s+(\d+)w)?[^,]*')
+
+# w=100, h=100 and dpr=1 anywhere in the query (before any #fragment), in any
+# order; one match instead of building urlparse/parse_qs objects per image
+_TINY_RE = re.compile(
+    r'^(?=[^#]*[?&]w=100(?:[&#]|$))'
+    r'(?=[^#]*[?&]h=100(?:[&#]|$))'
+    r'(?=[^#]*[?&]dpr=1(?:[&#]|$))'
+)
+
+try:
+    # optional compiled scan, see _srcset.pyx
+    from ._srcset import best_from_srcset
+except ImportError:
+    def best_from_srcset(srcset: str):
+        """Return (width, url) of the widest srcset candidate, or (-1, None)."""
+        best_w, best_url = -1, None
+        for m in _SRCSET_RE.finditer(srcset):
+            url_part, w_str = m.groups()
+            width = int(w_str) if w_str else 0
+            # keep the widest candidate seen so far (first one wins ties)
+            if width > best_w:
+                best_w, best_url = width, url_part
+        return best_w, best_url
 
-class BT_Scraper(ST_Scraper):
-    async def scrape_single_url(self, url: str) -> Dict[str, Any]:
-        # 1) get everything except images
-        data = await super().scrape_single_url(url)
-
-        # if we failed, just pass it along
-        if not isinstance(data, dict) or "article_url" not in data:
-            return data
-
-        # 2) fetch the DOM again so we can re-extract images
-        soup = await self._fetch_page_content(url)
-        if soup is None:
-            return data
 
-        article = soup.find("article")
-        if article is None:
-            return data
-
-        # 3) build a new images list by picking the highest-res candidate
+class BT_Scraper(ST_Scraper):
+    def _extract_images(self, article: Tag, url: str) -> List[Dict[str, Any]]:
+        # pick the highest-res candidate from each <picture>, reusing the DOM
+        # the base class already fetched instead of loading the page again
         images: List[Dict[str, Any]] = []
         for picture in article.find_all("picture"):
             best = self._best_image_from_picture(picture, url)
             if best:
                 images.append(best)
-
-        data["images"] = images
-        return data
+        return images
 
     def _is_tiny_author_image(self, url: str) -> bool:
         """
         Return True if the URL has w=100, h=100 and dpr=1 in its query string.
         """
-        q = parse_qs(urlparse(url).query)
-        return q.get("w", [""])[0] == "100" and \
-               q.get("h", [""])[0] == "100" and \
-               q.get("dpr", [""])[0] == "1"
+        return _TINY_RE.match(url) is not None
 
     def _best_image_from_picture(self, picture: Tag, page_url: str) -> Optional[Dict[str,Any]]:
-        candidates = []  # list of (width:int, url:str)
-
-        # pattern:  capture URL (\S+), then optional whitespace+digits+w
-        pattern = re.compile(r'(\S+)(?:\s+(\d+)w)?')
-
-        for source in picture.find_all("source"):
-            srcset = source.get("srcset", "")
-            for part in srcset.split(","):
-                part = part.strip()
-                if not part:
-                    continue
-                m = pattern.match(part)
-                if not m:
-                    continue
-                url_part, w_str = m.groups()
-                full_url = urljoin(page_url, url_part)
-                width = int(w_str) if w_str else 0
-                candidates.append((width, full_url))
+        best_w, best_url = -1, None
+
+        img = None
+
+        # one walk over the <picture> for both the <source>s and the <img>
+        for tag in picture.find_all(("source", "img")):
+            if tag.name == "img":
+                if img is None:
+                    img = tag
+                continue
+            srcset = tag.get("srcset")
+            if srcset is None:
+                continue
+            width, url_part = best_from_srcset(srcset)
+            if width > best_w:
+                best_w, best_url = width, url_part
+
+        # srcset URLs are almost always absolute; skip the urljoin parse
+        if best_url is not None and not best_url.startswith(("http://", "https://")):
+            best_url = _resolve_url(page_url, best_url)
 
         # fallback to <img> if nothing valid in srcset
-        if not candidates:
-            img = picture.find("img")
-            if img and img.get("src"):
-                candidates.append((0, urljoin(page_url, img["src"])))
+        if best_url is None and img and img.get("src"):
+            best_url = _resolve_url(page_url, img["src"])
 
-        if not candidates:
+        if best_url is None:
             return None
 
-        # pick the highest width
-        _, best_url = max(candidates, key=lambda x: x[0])
-        img = picture.find("img")
         alt = img.get("alt", "").strip() or None if img else None
 
         if self._is_tiny_author_image(best_url):
@@ -90,28 +93,6 @@ class BT_Scraper(ST_Scraper):
 
 
 
-def _run_one_file(txt_path: pathlib.Path,
-                  out_dir: pathlib.Path,
-                  err_dir: pathlib.Path,
-                  seen_dir: pathlib.Path,
-                  concurrency: int) -> str:
-    try:
-        asyncio.run(
-            process_txt_async(
-                txt_path,
-                out_dir,
-                err_dir,
-                concurrency,
-                BT_Scraper
-            )
-        )
-        # atomic rename so we can't double-process
-        txt_path.rename(seen_dir / txt_path.name)
-        return f"✔ {txt_path.name}"
-    except Exception as e:
-        logger.error(f"Worker failed on {txt_path}: {e}", exc_info=True)
-        return f"✖ {txt_path.name}: {e}"
-
 def main() -> None:
     BASE_DIR = pathlib.Path(
         "/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/business_times"
@@ -133,27 +114,25 @@ def main() -> None:
         logger.warning("No .txt files to process")
         return
 
-    logger.info(f"Submitting {len(txt_files)} files "
-                f"to a pool of {MAX_PARALLEL_TXT_FILES} workers")
-
-    # freeze the arguments other than txt_path
-    worker = functools.partial(
-        _run_one_file,
-        out_dir=OUT_DIR,
-        err_dir=ERR_DIR,
-        seen_dir=SEEN_DIR,
-        concurrency=CONCURRENCY_IN_FILE,
+    logger.info(f"Scraping {len(txt_files)} files, "
+                f"{MAX_PARALLEL_TXT_FILES} at a time on one shared browser")
+
+    # one event loop + one Chromium for every file, instead of a browser per
+    # worker process
+    aio.run(
+        process_files_async(
+            txt_files,
+            OUT_DIR,
+            ERR_DIR,
+            SEEN_DIR,
+            concurrency=CONCURRENCY_IN_FILE,
+            file_parallel=MAX_PARALLEL_TXT_FILES,
+            scraper_class=BT_Scraper,
+            ensure_ascii=False,
+            bloom_path=BASE_DIR / "seen.bf",
+        )
     )
 
-    # ── use processes for real parallelism (each owns a Chromium) ──
-    with concurrent.futures.ProcessPoolExecutor(
-            max_workers=MAX_PARALLEL_TXT_FILES
-    ) as pool:
-        for status in tqdm(pool.map(worker, txt_files),
-                           total=len(txt_files),
-                           desc="Files"):
-            logger.info(status)
-
     logger.info("All files processed!")
 
 if __name__ == "__main__":
@@ -1,29 +1,413 @@
 import aiofiles                 # NEW  ──────── async file I/O
-from urllib.parse import urljoin
-from bs4 import BeautifulSoup, Tag
+from urllib.parse import urljoin, urlsplit
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from bs4.filter import ElementFilter
 from dateutil import parser as dateparser
-from typing import Any, Dict, List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 import asyncio, json, pathlib, traceback
 from tqdm.auto import tqdm
-from playwright.async_api import async_playwright, Browser, BrowserContext
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 from ...utils.logger import logger  # Ensure this logger is configured
+from ...utils.bloom import BloomFilter, DEFAULT_CAPACITY
+from ...utils import aio
+import httpx
+import orjson
 import random
 import re
-import concurrent.futures, os, functools
+import concurrent.futures, os, functools, multiprocessing
+from concurrent.futures.process import BrokenProcessPool
+import math
+import mmap
 import time
 
+BROWSER_ARGS = [
+    "--no-sandbox",
+    "--disable-gpu",
+    "--disable-dev-shm-usage",  # Reduce memory usage
+    "--disable-web-security",
+    "--disable-features=VizDisplayCompositor",
+    # nothing a headless scraper needs: no extensions, sync, audio or
+    # background fetches competing for memory and sockets
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--metrics-recording-only",
+    "--mute-audio",
+    # headless pages count as backgrounded; don't let Chromium throttle them
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+]
+
+# V8 old-space budget for one browser, split between its renderers by
+# _js_heap_flag
+JS_HEAP_BUDGET_MB = 4096
+
+
+def _js_heap_flag(renderers: int) -> str:
+    """
+    Per-renderer V8 heap cap, so a leaky page can't balloon the worker. The
+    budget is divided by sqrt(renderers) rather than renderers (the square-root
+    heap-limit rule): heaps rarely peak together, so each gets more headroom
+    than an even split while the total still grows only with sqrt(renderers).
+    """
+    limit = max(128, int(JS_HEAP_BUDGET_MB / math.sqrt(max(1, renderers))))
+    return f"--js-flags=--max-old-space-size={limit}"
+
+
+def _parse_date(raw: str) -> str:
+    """
+    ISO-8601 strings (the usual <time datetime> / meta value) take the C
+    fromisoformat path; anything else falls back to dateutil.
+    """
+    try:
+        return datetime.fromisoformat(raw).isoformat()
+    except ValueError:
+        return dateparser.parse(raw).isoformat()
+
+
+# the "Published" span, once its prefix is stripped: "Thu, May 29, 2014 · 10:00 PM"
+_PUBLISHED_FORMAT = "%a, %b %d, %Y · %I:%M %p"
+
+
+def _parse_published(raw: str) -> str:
+    """
+    The "Published" span text: ST's own format via strptime, anything else via
+    _parse_date with the "·" separator (which dateutil rejects) blanked out.
+    """
+    try:
+        return datetime.strptime(raw, _PUBLISHED_FORMAT).isoformat()
+    except ValueError:
+        return _parse_date(raw.replace("·", " "))
+
+
+@functools.lru_cache(maxsize=256)
+def _origin(page_url: str) -> str:
+    parts = urlsplit(page_url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _img_parent(img: Tag) -> Tag:
+    """
+    The element an <img> sits in, as html.parser would see it. lxml doesn't
+    treat <source> as a void element, so in <picture><source><img> it nests
+    the <img> (and any later <source>) inside the <source>.
+    """
+    parent = img.parent
+    while parent.name == "source":
+        parent = parent.parent
+    return parent
+
+
+def _resolve_url(page_url: str, src: str) -> str:
+    """
+    urljoin(page_url, src), minus the parsing for the shapes nearly every
+    image src has: already absolute, protocol-relative (CDN hosts), or
+    relative to the site root. Anything else (path-relative, dot segments)
+    still goes to urljoin.
+    """
+    if src.startswith(("https://", "http://")):
+        return src
+    if src.startswith("//"):
+        return page_url[:page_url.find(":") + 1] + src
+    if src.startswith("/") and "/." not in src:
+        return _origin(page_url) + src
+    return urljoin(page_url, src)
+
+
+# only the HTML is scraped (image URLs come from attributes), so the browser
+# never needs to download these
+_BLOCKED_RESOURCES = frozenset({
+    "image", "media", "font", "stylesheet", "texttrack", "manifest", "other",
+})
+
+# ad / analytics hosts (and their subdomains); none of them render article text
+_BLOCKED_HOSTS = (
+    "doubleclick.net", "googlesyndication.com", "googletagservices.com",
+    "googletagmanager.com", "google-analytics.com", "amazon-adsystem.com",
+    "facebook.net", "scorecardresearch.com", "chartbeat.com", "chartbeat.net",
+    "outbrain.com", "taboola.com",
+)
+
+# an <article> start tag (not "<articles"). It also matches "<article>" inside
+# a script string or a comment, so it's only a hint; see scrape_single_url
+_ARTICLE_TAG_RE = re.compile(rb"<article[\s>]")
+
+
+class _PageGoneError(RuntimeError):
+    """The site answered 404/410: fetching the URL again won't find an article."""
+
+
+class _NoArticleError(RuntimeError):
+    """The parsed page has no <article> element."""
+
+# publish-date fallbacks in _extract_publish_date, built once instead of per article
+_PUBLISHED_RE = re.compile(r"\bPublished\b", re.IGNORECASE)
+_PUBLISHED_PREFIX_RE = re.compile(r"^[Pp]ublished[:·\s]*")
+_META_PUBLISHED = {"property": "article:published_time"}
+
+# page is parsed to the end and has its <article>; see _fetch_html
+_ARTICLE_READY_JS = (
+    "document.readyState !== 'loading' && document.querySelector('article') !== null"
+)
+
+# outerHTML of every element matching the selectors, in document order,
+# skipping matches nested inside another match (already in its outerHTML)
+_SLIM_PAGE_JS = """
+selectors => {
+    const els = Array.from(document.querySelectorAll(selectors.join(",")));
+    return els
+        .filter(e => !els.some(o => o !== e && o.contains(e)))
+        .map(e => e.outerHTML)
+        .join("");
+}
+"""
+
+
+def _is_blocked_host(url: str) -> bool:
+    host = urlsplit(url).hostname or ""
+    return any(host == h or host.endswith("." + h) for h in _BLOCKED_HOSTS)
+
+
+async def _block_heavy_resources(route) -> None:
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCES or _is_blocked_host(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+def _dump_line(item: Any, ensure_ascii: bool) -> bytes:
+    """One JSONL record as bytes, encoded by orjson."""
+    line = orjson.dumps(item, default=str)
+    if ensure_ascii and not line.isascii():
+        # orjson only emits raw UTF-8; keep the \uXXXX escapes callers asked
+        # for. That encodes the record twice, so the scrapers' mains all pass
+        # ensure_ascii=False
+        line = json.dumps(item, ensure_ascii=True, default=str).encode("ascii")
+    return line + b"\n"
+
+
+# pages are parsed in worker processes so soup building never stalls the event
+# loop driving the fetches; one pool per process, started on first use
+_parse_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+# inside a worker: one parse-only scraper per class (never entered, no browser)
+_parsers: Dict[type, "ST_Scraper"] = {}
+
+
+def _get_parse_pool() -> concurrent.futures.ProcessPoolExecutor:
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            # a forked child would inherit the parent's event loop and threads
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _parse_pool
+
+
+def _shutdown_parse_pool(pool: Optional[concurrent.futures.ProcessPoolExecutor] = None,
+                         wait: bool = True) -> None:
+    """
+    Shut the parse pool down so the next _get_parse_pool starts a fresh one.
+    With pool, only if that is still the current pool: when a broken pool
+    fails many parses at once, the first caller replaces it and the rest
+    don't shut down its replacement.
+    """
+    global _parse_pool
+    if _parse_pool is None or (pool is not None and pool is not _parse_pool):
+        return
+    old, _parse_pool = _parse_pool, None
+    old.shutdown(wait=wait, cancel_futures=True)
+
+
+async def _parse_in_pool(scraper_cls: type, html: str, url: str) -> Dict[str, Any]:
+    """_parse_html in the parse pool, replacing the pool once if it has broken."""
+    loop = asyncio.get_running_loop()
+    pool = _get_parse_pool()
+    try:
+        return await loop.run_in_executor(pool, _parse_html, scraper_cls, html, url)
+    except BrokenProcessPool:
+        # a worker died (OOM on a huge page, an lxml crash) and took the pool
+        # with it; every later submit would fail, so start a new one
+        logger.warning(f"Parse pool broke while parsing {url}; restarting it")
+        _shutdown_parse_pool(pool, wait=False)
+        return await loop.run_in_executor(
+            _get_parse_pool(), _parse_html, scraper_cls, html, url
+        )
+
+
+# the selector shapes page_selectors may use: a tag name, then any number of
+# [attr] / [attr="value"] conditions
+_SELECTOR_RE = re.compile(r'([a-z][a-z0-9]*)((?:\[[\w-]+(?:="[^"]*")?\])*)')
+_SELECTOR_ATTR_RE = re.compile(r'\[([\w-]+)(?:="([^"]*)")?\]')
+
+
+class _SelectorStrainer(ElementFilter):
+    """
+    parse_only filter keeping the elements that match any of the selectors
+    (and everything inside them); bs4 asks it about top-level tags only.
+    """
+
+    def __init__(self, selectors: Tuple[str, ...]):
+        self.strainers = []
+        for sel in selectors:
+            m = _SELECTOR_RE.fullmatch(sel)
+            if m is None:
+                raise ValueError(
+                    f'page_selectors entries must be a tag name plus optional '
+                    f'[attr] / [attr="value"] conditions, got {sel!r}'
+                )
+            # [attr] only needs the attribute present; [attr="v"] needs the value
+            attrs = {
+                am.group(1): True if am.group(2) is None else am.group(2)
+                for am in _SELECTOR_ATTR_RE.finditer(m.group(2))
+            }
+            self.strainers.append(SoupStrainer(m.group(1), attrs))
+
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        return any(st.allow_tag_creation(nsprefix, name, attrs) for st in self.strainers)
+
+    def allow_string_creation(self, string: str) -> bool:
+        return False                    # text between the kept elements
+
+
+@functools.lru_cache(maxsize=None)
+def _page_strainer(selectors: Tuple[str, ...]) -> _SelectorStrainer:
+    """
+    Keep only the elements a scraper's page_selectors match (and what they
+    contain) when building the soup; the nav, footer and scripts around the
+    <article> are never turned into Tags.
+    """
+    return _SelectorStrainer(selectors)
+
+
+def _make_soup(html: str, selectors: Tuple[str, ...]) -> BeautifulSoup:
+    return BeautifulSoup(html, "lxml", parse_only=_page_strainer(selectors))
+
+
+def _parse_html(scraper_cls: type, html: str, url: str) -> Dict[str, Any]:
+    """Parse-pool entry point: the article record for one fetched page."""
+    parser = _parsers.get(scraper_cls)
+    if parser is None:
+        parser = _parsers[scraper_cls] = scraper_cls()
+    return parser._parse_article(_make_soup(html, scraper_cls.page_selectors), url)
+
+
+def _new_http_client(concurrency: int) -> httpx.AsyncClient:
+    """HTTP/2 client for the static fetch path, sized for `concurrency` fetches."""
+    return httpx.AsyncClient(
+        http2=True,
+        follow_redirects=True,
+        timeout=10.0,
+        limits=httpx.Limits(
+            max_keepalive_connections=concurrency,
+            max_connections=concurrency * 2,
+        ),
+    )
+
+
+class SharedBrowser:
+    """
+    One Chromium launched lazily and handed to every scraper in the same event
+    loop, so files processed back to back don't each pay the browser start-up.
+    The owner of the SharedBrowser is responsible for calling close().
+    """
+
+    def __init__(self, renderers: int = 1):
+        # how many pages will be open at once; sizes the per-renderer V8 heap
+        self.renderers = renderers
+        self.playwright = None
+        self.browser: Optional[Browser] = None
+        self._launch_future: Optional[asyncio.Future] = None
+
+    async def get(self) -> Browser:
+        """
+        Return the live browser, launching (or relaunching after a crash) as
+        needed. Concurrent callers all await the same launch future, so a
+        burst of scrapers starting together still spawns only one Chromium.
+        """
+        fut = self._launch_future
+        if (
+            fut is None
+            or (fut.done() and (fut.cancelled() or fut.exception() is not None
+                                or not fut.result().is_connected()))
+        ):
+            fut = self._launch_future = asyncio.ensure_future(self._launch())
+        return await fut
+
+    async def _launch(self) -> Browser:
+        if self.playwright is None:
+            self.playwright = await async_playwright().start()
+        if self.browser is not None:
+            logger.warning("Shared browser disconnected; relaunching")
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+        self.browser = await self.playwright.chromium.launch(
+            headless=True,
+            args=BROWSER_ARGS + [_js_heap_flag(self.renderers)],
+        )
+        return self.browser
+
+    async def close(self):
+        self._launch_future = None
+        if self.browser:
+            await self.browser.close()
+            self.browser = None
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+
+
 class ST_Scraper:
     """Scrapes articles using Playwright with batch processing and context reuse"""
 
-    def __init__(self, concurrency: int = 5):
+    # the parts of a page that are sent back to Python from the browser and
+    # kept when the soup is built; subclasses that read anything outside
+    # <article> add their selectors (tag name first)
+    page_selectors: Tuple[str, ...] = (
+        "title",
+        'meta[property="article:published_time"]',
+        "article",
+    )
+    # fetches tried per URL before it is recorded as having no <article>
+    max_retries: int = 2
+
+    def __init__(
+        self,
+        concurrency: int = 5,
+        shared_browser: Optional[SharedBrowser] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        # a page_selectors entry the soup strainer can't express fails here,
+        # not once per URL inside the parse pool
+        _page_strainer(self.page_selectors)
         self.concurrency = concurrency
+        self.shared_browser = shared_browser
+        self._owns_browser = shared_browser is None
+        self._contexts_lock = asyncio.Lock()
         self.min_interval = 0.05
-        self._last_request_ts = 0.0
-        self._rate_lock = asyncio.Lock()
+        self._next_slot = 0.0
+        # seconds one browser fetch may take, navigation and wait together
+        self.page_timeout = 12.0
         self.semaphore = asyncio.Semaphore(concurrency)
         self.browser: Optional[Browser] = None
         self.contexts: List[BrowserContext] = []
-        self.context_semaphore = asyncio.Semaphore(concurrency)
+        # idle (context, page) slots; a fetch checks one out, so each context
+        # runs one page at a time and that page is reused for the next URL.
+        # LIFO, so under light load the same warm slot keeps being picked
+        self._ctx_pool: asyncio.Queue[Tuple[BrowserContext, Optional[Page]]] = asyncio.LifoQueue()
+        # browser navigations per context; a context is swapped for a fresh
+        # one after context_max_pages to drop what its pages left behind
+        self.context_max_pages = 200
+        self._ctx_uses: Dict[BrowserContext, int] = {}
+        # a client handed in is shared with other scrapers (and closed by
+        # whoever made it); otherwise _get_http makes one for this scraper
+        self._http: Optional[httpx.AsyncClient] = http_client
+        self._owns_http = http_client is None
         self.ua_pool = [
             # Chrome (Win, Mac, Linux)
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -39,46 +423,87 @@ class ST_Scraper:
             "Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) "
             "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Mobile/15E148 Safari/604.1",
         ]
+        # sent per request, so scrapers sharing a client keep their own UA
+        self.user_agent = random.choice(self.ua_pool)
 
     async def __aenter__(self):
         """Async context manager entry"""
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(
-            headless=True,
-            args=[
-                "--no-sandbox", 
-                "--disable-gpu",
-                "--disable-dev-shm-usage",  # Reduce memory usage
-                "--disable-web-security",
-                "--disable-features=VizDisplayCompositor"
-            ],
-        )
-        
-        # Pre-create browser contexts for reuse
-        logger.info(f"Creating {self.concurrency} browser contexts for reuse")
-        for i in range(self.concurrency):
-            context = await self.browser.new_context(
-                viewport={"width": 1920, "height": 1080},
-                user_agent=(
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/115.0.0.0 Safari/537.36"
-                ),
-            )
-            self.contexts.append(context)
-        
+        if self.shared_browser is None:
+            # nobody lent us a browser, so run a private one
+            self.shared_browser = SharedBrowser(renderers=self.concurrency)
+        await self._ensure_browser()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        # Close all contexts
-        for context in self.contexts:
-            await context.close()
-        
-        if self.browser:
-            await self.browser.close()
-        if self.playwright:
-            await self.playwright.stop()
+        # Close all contexts (a crashed browser has already dropped them)
+        if self.browser and self.browser.is_connected():
+            for context in self.contexts:
+                await context.close()
+        self.contexts = []
+
+        if self._owns_browser:
+            await self.shared_browser.close()
+            self.shared_browser = None
+
+        if self._http is not None and self._owns_http:
+            await self._http.aclose()
+        self._http = None
+
+    async def _new_context(self, browser: Browser) -> BrowserContext:
+        context = await browser.new_context(
+            viewport={"width": 1920, "height": 1080},
+            user_agent=(
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) "
+                "Chrome/115.0.0.0 Safari/537.36"
+            ),
+        )
+        await context.route("**/*", _block_heavy_resources)
+        return context
+
+    async def _create_contexts(self, browser: Browser) -> List[BrowserContext]:
+        # Pre-create browser contexts for reuse
+        logger.info(f"Creating {self.concurrency} browser contexts for reuse")
+        return [await self._new_context(browser) for _ in range(self.concurrency)]
+
+    async def _recycle_context(self, context: BrowserContext) -> Optional[BrowserContext]:
+        """
+        Replace one worn context with a fresh one on the same browser; the other
+        slots keep fetching meanwhile, unlike a whole-browser restart.
+        Returns None (keep using the old one for now) if that fails.
+        """
+        try:
+            fresh = await self._new_context(self.browser)
+        except Exception as e:
+            logger.warning(f"Could not replace a browser context: {e}")
+            self._ctx_uses[context] = 0
+            return None
+        if context in self.contexts:
+            self.contexts[self.contexts.index(context)] = fresh
+        self._ctx_uses.pop(context, None)
+        try:
+            await context.close()  # takes its page with it
+        except Exception:
+            pass
+        return fresh
+
+    async def _ensure_browser(self) -> None:
+        """Make sure our contexts live on a connected browser, rebuilding after a relaunch."""
+        browser = await self.shared_browser.get()
+        if browser is self.browser:
+            return
+        async with self._contexts_lock:
+            if browser is self.browser:
+                return
+            # swap both in only once the new contexts exist
+            contexts = await self._create_contexts(browser)
+            pool: asyncio.Queue[Tuple[BrowserContext, Optional[Page]]] = asyncio.LifoQueue()
+            for context in contexts:
+                pool.put_nowait((context, None))  # page opened on first use
+            self.contexts, self._ctx_pool = contexts, pool
+            self._ctx_uses = {}
+            self.browser = browser
 
     def _clean_content(self, article: Tag) -> str:
         """Extract and clean text content from article tag"""
@@ -95,36 +520,88 @@ class ST_Scraper:
         Resolve relative/absolute URLs for the given <img>.
         """
         src = img_tag.get("src") or img_tag.get("data-src") or img_tag.get("data-original")
-        return urljoin(page_url, src) if src else None
+        return _resolve_url(page_url, src) if src else None
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """The static-path HTTP/2 client: the shared one, or this scraper's own."""
+        if self._http is None or self._http.is_closed:
+            self._http = _new_http_client(self.concurrency)
+            self._owns_http = True
+        return self._http
 
-    async def _get_available_context(self) -> BrowserContext:
-        """Get an available browser context from the pool"""
-        async with self.context_semaphore:
-            # Simple round-robin selection
-            context_index = len(self.contexts) - self.context_semaphore._value - 1
-            return self.contexts[context_index % len(self.contexts)]
+    async def _fetch_static(self, url: str) -> Optional[str]:
+        """
+        Plain GET of the server-rendered HTML. Returns None (so the caller falls
+        back to Chromium) on any failure or when the page has no <article> yet.
+        """
+        try:
+            resp = await self._get_http().get(url, headers={"User-Agent": self.user_agent})
+        except httpx.HTTPError as e:
+            logger.debug(f"Static fetch failed for {url}: {e}")
+            return None
+        if resp.status_code != 200:
+            logger.debug(f"Static fetch got HTTP {resp.status_code} for {url}")
+            return None
+        # a JS shell has no <article> markup at all; leave it to the browser
+        if _ARTICLE_TAG_RE.search(resp.content) is None:
+            return None
+        # decoded with the charset the response declares (httpx falls back to
+        # UTF-8), so bs4 has no sniffing to do
+        return resp.text
+
+    async def _wait_for_slot(self) -> None:
+        """
+        Space request starts min_interval apart. Each caller books the next free
+        start time up front (no lock, so no queue of waiters to wake in turn) and
+        sleeps until it; over any window the rate is exactly 1 / min_interval.
+        """
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.min_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
 
-    async def _fetch_page_content(self, url: str) -> Optional[BeautifulSoup]:
-        """Fetch page content using Playwright with context reuse"""
+    async def _fetch_html(self, url: str, static: bool = True) -> Optional[str]:
+        """
+        Fetch page HTML over plain HTTP, falling back to Playwright with context
+        reuse. static=False goes straight to the browser.
+        """
         if not self.browser:
             raise RuntimeError("Browser not started. Use 'async with'.")
-        
+
+        # sleep out the rate-limit slot before taking a semaphore slot, so a
+        # waiting caller doesn't hold one of the concurrent fetches idle
+        await self._wait_for_slot()
         async with self.semaphore:
-            async with self._rate_lock:              # only one task enters here
-                elapsed = time.monotonic() - self._last_request_ts
-                wait_for = self.min_interval - elapsed
-                if wait_for > 0:
-                    await asyncio.sleep(wait_for)
-                self._last_request_ts = time.monotonic()
-
-            context = await self._get_available_context()
-            page = await context.new_page()
+            # most article pages are rendered server-side, so skip the browser
+            # whenever the raw HTML already carries the <article>
+            if static:
+                html = await self._fetch_static(url)
+                if html is not None:
+                    logger.debug(f"Fetched {url} without the browser")
+                    return html
+
+            await self._ensure_browser()
+            # hand the slot back to the pool it came from; after a relaunch
+            # that's the stale pool, which is dropped along with the old browser
+            pool = self._ctx_pool
+            context, page = await pool.get()
+            reusable = False
             try:
+                if page is None or page.is_closed():
+                    page = await context.new_page()
+                # goto replaces the previous document, so the page is reused
+                # return as soon as the response commits; the wait below
+                # decides when the document is ready
+                deadline = time.monotonic() + self.page_timeout
                 response = await page.goto(
                     url,
-                    wait_until="domcontentloaded",
-                    timeout=20_000
+                    wait_until="commit",
+                    timeout=self.page_timeout * 1000
                 )
+                # navigation finished, so the page is fine to reuse even if
+                # this particular response turns out to be unusable
+                reusable = True
                 status = response.status if response else None
 
                 if status == 429:
@@ -136,138 +613,304 @@ class ST_Scraper:
                         headers = await response.all_headers()
                         logger.debug(f"Response headers for {url}: {headers}")
                     raise RuntimeError("429 Too Many Requests")
-                elif status in (404, 410, 500, 503):
+                elif status in (404, 410):
+                    logger.error(f"HTTP {status} error for {url}")
+                    raise _PageGoneError(f"HTTP {status}")
+                elif status in (500, 503):
                     logger.error(f"HTTP {status} error for {url}")
                     raise RuntimeError(f"HTTP {status}")
                 elif status != 200:
                     logger.error(f"Unexpected HTTP {status} for {url}")
                     raise RuntimeError(f"Unexpected HTTP {status}")
                 
-                await page.wait_for_selector("article", timeout=30000)
+                # readyState leaves "loading" once the HTML is fully parsed (so
+                # the <article> can't be cut off mid-stream), but before deferred
+                # scripts run and DOMContentLoaded fires
+                # gets whatever budget the navigation left, so a slow tail
+                # page costs page_timeout at most, not two full timeouts
+                remaining = max(deadline - time.monotonic(), 1.0)
+                await page.wait_for_function(_ARTICLE_READY_JS, timeout=remaining * 1000)
                 
-                html = await page.content()
+                # only the elements the parsers read cross the IPC boundary,
+                # not the whole serialized DOM
+                html = await page.evaluate(_SLIM_PAGE_JS, list(self.page_selectors))
                 logger.debug(f"Successfully fetched content from {url}")
-                return BeautifulSoup(html, "html.parser")
+                return html
                 
+            except _PageGoneError:
+                raise                           # no point retrying; see scrape_single_url
             except Exception as e:
                 logger.error(f"Failed to fetch {url}: {e}")
                 return None
             finally:
-                await page.close()  # Close the page but keep context alive
+                try:
+                    if not reusable and page is not None:
+                        # a failed navigation can leave the page half-loaded
+                        # or crashed; drop it and open a fresh one next time
+                        await page.close()
+                    uses = self._ctx_uses[context] = self._ctx_uses.get(context, 0) + 1
+                    if uses >= self.context_max_pages and pool is self._ctx_pool:
+                        fresh = await self._recycle_context(context)
+                        if fresh is not None:
+                            context, reusable = fresh, False
+                finally:
+                    pool.put_nowait((context, page if reusable else None))
 
     async def scrape_single_url(self, url: str) -> Dict[str, Any]:
         """Scrape a single URL for article content, metadata, images, and generate summary."""
         logger.debug(f"Starting scrape for URL: {url}")
         
         try:
-            max_retries = 2
-            for attempt in range(max_retries):
-                soup = await self._fetch_page_content(url)
-                if soup and soup.find("article"):
+            for attempt in range(self.max_retries):
+                if attempt:
+                    # back off before refetching: a 429 or a slow render rarely
+                    # clears straight away. A 404/410 raises out of the loop
+                    # instead, since every retry would get the same page
+                    await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+                # both fetch paths only return pages that (seem to) have an <article>
+                html = await self._fetch_html(url)
+                if html is not None:
                     logger.info(f"Article successfully found {url}")
                     break
                 logger.info(f"Retrying {url}")
-                
-            article = soup.find("article")
-            if not article:
-                logger.error(f"No <article> tag found in {url}")
+            else:
                 raise RuntimeError("No <article> tag found")
 
-            # Title
-            h1 = article.find("h1")
-            title = (
-                h1.get_text(strip=True)
-                if h1
-                else (soup.title.string.strip() if soup.title else "(untitled)")
-            )
-
-            # Published date (rich logic)
-            pub_date: Optional[str] = None
-            time_tag = article.find("time")
-            if time_tag and time_tag.has_attr("datetime"):
-                try:
-                    pub_date = dateparser.parse(time_tag["datetime"]).isoformat()
-                except (ValueError, TypeError):
-                    pass
-            elif time_tag:
+            try:
+                return await _parse_in_pool(type(self), html, url)
+            except _NoArticleError:
+                # the static path only saw "<article" in the raw bytes, which
+                # a script string or comment also has; the parsed tree had no
+                # such element, so render the page in the browser instead
+                html = await self._fetch_html(url, static=False)
+                if html is None:
+                    raise
+                return await _parse_in_pool(type(self), html, url)
+
+        except Exception as e:
+            return self._error_record(url, e)
+
+    def _error_record(self, url: str, e: Exception) -> Tuple[str, str, str, str]:
+        """
+        The ("ERROR", url, repr(e), traceback) record for a failed URL. Call
+        from the except block. The traceback is formatted once, for the error
+        file only; the log gets a single line per URL.
+        """
+        logger.error(f"Error scraping {url}: {e!r}")
+        return ("ERROR", url, repr(e), traceback.format_exc())
+
+    def _parse_article(self, soup: Optional[BeautifulSoup], url: str) -> Dict[str, Any]:
+        """Build the article record from an already-fetched page."""
+        article = soup.find("article") if soup else None
+        if not article:
+            raise _NoArticleError("No <article> tag found")
+
+        # Title
+        h1 = article.find("h1")
+        title = (
+            h1.get_text(strip=True)
+            if h1
+            else (soup.title.string.strip() if soup.title else "(untitled)")
+        )
+
+        # Published date
+        pub_date = self._extract_publish_date(soup, article, url)
+
+        # Extract and clean content
+        content = self._clean_content(article)
+
+        # Collect images with alt text and caption
+        images = self._extract_images(article, url)
+
+        return {
+            "article_url": url,
+            "site_title": title,
+            "publish_date": pub_date,
+            "content": content,
+            "images": images,
+        }
+
+    def _extract_publish_date(self, soup: BeautifulSoup, article: Tag, url: str) -> Optional[str]:
+        """The article's publish date as an ISO string, or None; subclasses override this."""
+        pub_date: Optional[str] = None
+        time_tag = article.find("time")
+        if time_tag and time_tag.has_attr("datetime"):
+            try:
+                pub_date = _parse_date(time_tag["datetime"])
+            except (ValueError, TypeError):
+                pass
+        elif time_tag:
+            try:
+                pub_date = _parse_date(time_tag.get_text(strip=True))
+            except (ValueError, TypeError):
+                pass
+        else:
+            # 1) Look for <span>Published Thu, May 29, 2014 · 10:00 PM</span>
+            span = article.find("span", string=_PUBLISHED_RE)
+            if span:
+                raw = span.get_text(strip=True)
+                # remove leading "Published", optional colon/dot and whitespace
+                cleaned = _PUBLISHED_PREFIX_RE.sub("", raw)
                 try:
-                    pub_date = dateparser.parse(time_tag.get_text(strip=True)).isoformat()
+                    pub_date = _parse_published(cleaned)
                 except (ValueError, TypeError):
                     pass
+
             else:
-                # 1) Look for <span>Published Thu, May 29, 2014 · 10:00 PM</span>
-                span = article.find("span", string=re.compile(r"\bPublished\b", re.IGNORECASE))
-                if span:
-                    raw = span.get_text(strip=True)
-                    # remove leading "Published", optional colon/dot and whitespace
-                    cleaned = re.sub(r"^[Pp]ublished[:·\s]*", "", raw)
+                # 2) Fallback to meta[property="article:published_time"]
+                meta = soup.find("meta", _META_PUBLISHED)
+                if meta and meta.has_attr("content"):
                     try:
-                        pub_date = dateparser.parse(cleaned).isoformat()
+                        pub_date = _parse_date(meta["content"])
                     except (ValueError, TypeError):
                         pass
+        return pub_date
 
-                else:
-                    # 2) Fallback to meta[property="article:published_time"]
-                    meta = soup.find("meta", {"property": "article:published_time"})
-                    if meta and meta.has_attr("content"):
-                        try:
-                            pub_date = dateparser.parse(meta["content"]).isoformat()
-                        except (ValueError, TypeError):
-                            pass
-
-            # Extract and clean content
-            content = self._clean_content(article)
-
-            # Collect images with alt text and caption
-            images: List[Dict[str, Any]] = []
-            
-            for picture in article.find_all("picture"):
-                # grab alt text from the <img> if present
-                img_tag = picture.find("img")
-                alt = img_tag.get("alt", "").strip() or None if img_tag else None
-
-                # now pull every <source> and that <img>
-                for tag in picture.find_all(["img"]):
-                    src = self._extract_image_src(tag, url)
-                    if not src:
-                        continue
-                    images.append({
-                        "image_url": src,
-                        "alt_text": alt
-                    })
-
-            return {
-                "article_url": url,
-                "site_title": title,
-                "publish_date": pub_date,
-                "content": content,
-                "images": images,
-            }
-            
-        except Exception as e:
-            logger.error(f"Error scraping {url}: {e}", exc_info=True)
-            return ("ERROR", url, repr(e), traceback.format_exc())
+    def _extract_images(self, article: Tag, url: str) -> List[Dict[str, Any]]:
+        """Collect the <picture> images in the article; subclasses override this."""
+        images: List[Dict[str, Any]] = []
+        seen = set()  # the same image often appears in several <picture>s
+
+        for picture in article.find_all("picture"):
+            # one walk of the picture's subtree; alt text comes from its first <img>
+            img_tags = picture.find_all("img")
+            alt = (img_tags[0].get("alt", "").strip() or None) if img_tags else None
+
+            for tag in img_tags:
+                src = self._extract_image_src(tag, url)
+                if not src or src in seen:
+                    continue
+                seen.add(src)
+                images.append({
+                    "image_url": src,
+                    "alt_text": alt
+                })
+        return images
 
     async def scrape_urls_batch(self, urls: List[str]) -> List[Any]:
         """Scrape multiple URLs concurrently"""
         logger.info(f"Starting batch scrape of {len(urls)} URLs")
         
-        tasks = []
-        for url in urls:
-            await asyncio.sleep(0.15)   # 200 ms between task-spawns
-            tasks.append(self.scrape_single_url(url))
-        results = await asyncio.gather(*tasks)
+        # the request rate is capped where pages are fetched, not at spawn time
+        results = await asyncio.gather(*(self.scrape_single_url(url) for url in urls))
         logger.info(f"Completed batch scrape of {len(urls)} URLs")
         return results
 
 
+def _read_txt_urls(txt_path: pathlib.Path) -> List[str]:
+    """URLs in a sitemap .txt, in order; repeats keep their first occurrence only."""
+    return list(dict.fromkeys(
+        u for u in (ln.strip() for ln in txt_path.read_text().splitlines()) if u
+    ))
+
+
+# the "article_url" value of a record we wrote ourselves: quotes inside JSON
+# strings are always escaped, so this can't match text inside "content"
+_ARTICLE_URL_RE = re.compile(rb'"article_url"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def _iter_article_urls(jsonl: pathlib.Path):
+    """
+    Yield the article_url of every record in a JSONL file with one regex pass
+    over the mmapped bytes, instead of decoding each full record.
+    """
+    with open(jsonl, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for m in _ARTICLE_URL_RE.finditer(mm):
+                raw = m.group(1)
+                if b"\\" in raw:
+                    # \uXXXX etc. (ensure_ascii output): let orjson unescape
+                    yield orjson.loads(b'"' + raw + b'"')
+                else:
+                    yield raw.decode("utf-8")
+
+
+# "#<bytes>" lines in a .urls sidecar: the JSONL size its URLs cover so far
+_SIDECAR_STAMP_RE = re.compile(r"^#\d+$", re.M)
+
+
+def _sidecar_urls(out_file: pathlib.Path, size: int) -> Optional[set]:
+    """
+    The URLs in out_file's `.urls` sidecar, or None if it is missing or its
+    last stamp isn't `size`; see _read_scraped_urls.
+    """
+    try:
+        data = out_file.with_suffix(".urls").read_bytes()
+    except FileNotFoundError:
+        return None
+    stamp = b"#%d\n" % size
+    if not (data.endswith(b"\n" + stamp) or data == stamp):
+        return None
+    text = data.decode("utf-8")
+    # one read and a C-level split, no per-line Python work
+    urls = set(text.split("\n"))
+    urls.difference_update(_SIDECAR_STAMP_RE.findall(text))
+    urls.discard("")
+    return urls
+
+
+def _read_scraped_urls(out_file: pathlib.Path) -> set:
+    """
+    article_url of every record already in out_file (empty if it doesn't exist).
+
+    The URLs are kept one per line in a `.urls` sidecar that process_txt_async
+    appends to right after the matching records, each batch followed by a
+    "#<bytes>" stamp of the JSONL size it brings the file to. So normally only
+    that small file is read. It's rebuilt from the JSONL when missing, or when
+    its last stamp isn't the JSONL's size (a crash between the two writes, or
+    an outside edit); file sizes, unlike mtimes, can't tie.
+    """
+    sidecar = out_file.with_suffix(".urls")
+    if not out_file.exists():
+        sidecar.unlink(missing_ok=True)
+        return set()
+    size = out_file.stat().st_size
+    processed_urls = _sidecar_urls(out_file, size)
+    if processed_urls is not None:
+        return processed_urls
+
+    processed_urls = set(_iter_article_urls(out_file))
+
+    tmp = sidecar.with_suffix(".urls.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.writelines(u + "\n" for u in processed_urls)
+        f.write(f"#{size}\n")
+    tmp.replace(sidecar)
+    return processed_urls
+
+
+def _find_scraped(urls: set, out_dir: pathlib.Path, skip: pathlib.Path) -> set:
+    """
+    The members of `urls` that really are in a .jsonl in out_dir (other than
+    `skip`), to confirm the seen filter's hits. Read-only: other files may be
+    mid-write, so a stale sidecar is bypassed for its JSONL, never rebuilt.
+    """
+    found: set = set()
+    for jsonl in out_dir.glob("*.jsonl"):
+        left = urls - found
+        if not left:
+            break
+        if jsonl == skip:
+            continue
+        done = _sidecar_urls(jsonl, jsonl.stat().st_size)
+        found.update(left.intersection(
+            done if done is not None else _iter_article_urls(jsonl)
+        ))
+    return found
+
+
 async def process_txt_async(
     txt_path: pathlib.Path,
     out_dir: pathlib.Path,
     err_dir: pathlib.Path,
     concurrency: int = 5,
     scraper_class: type=ST_Scraper,
-    ensure_ascii: bool=True
+    ensure_ascii: bool=True,
+    shared_browser: Optional[SharedBrowser]=None,
+    seen_filter: Optional[BloomFilter]=None,
+    http_client: Optional[httpx.AsyncClient]=None
 ) -> str | None:
     year_month = txt_path.stem
     out_file = out_dir / f"{year_month}.jsonl"
@@ -275,9 +918,13 @@ async def process_txt_async(
 
     logger.info(f"Processing {txt_path.name}…")
 
-    # ── 1) Read all URLs from the .txt ────────────────────────────────────────
+    # ── 1) Read all URLs from the .txt, and the ones already scraped ─────────
+    # both reads run in worker threads so files sharing this loop keep scraping
     try:
-        urls = [ln.strip() for ln in txt_path.read_text().splitlines() if ln.strip()]
+        urls, processed_urls = await asyncio.gather(
+            asyncio.to_thread(_read_txt_urls, txt_path),
+            asyncio.to_thread(_read_scraped_urls, out_file),
+        )
     except Exception as e:
         logger.error(f"Error reading {txt_path}: {e}", exc_info=True)
         return None
@@ -287,18 +934,20 @@ async def process_txt_async(
         return year_month
 
     # ── 2) Filter out URLs we've already scraped successfully ───────────────
-    processed_urls = set()
-    if out_file.exists():
-        for line in out_file.read_text(encoding="utf-8").splitlines():
-            try:
-                rec = json.loads(line)
-                if isinstance(rec, dict) and "article_url" in rec:
-                    processed_urls.add(rec["article_url"])
-            except json.JSONDecodeError:
-                continue
-
-    # Keep only the ones not yet done
+    # Keep only the ones not yet done (here, or in any other file per the filter)
     urls = [u for u in urls if u not in processed_urls]
+    if seen_filter is not None:
+        # a filter hit only means "maybe": a false positive would drop an
+        # unscraped article for good, so hits are checked against the files
+        maybe = {u for u in urls if u in seen_filter}
+        if maybe:
+            seen = await asyncio.to_thread(_find_scraped, maybe, out_dir, out_file)
+            if len(seen) < len(maybe):
+                logger.info(
+                    f"{len(maybe) - len(seen)} URLs in {txt_path.name} matched "
+                    f"the seen filter but no scraped file; scraping them"
+                )
+            urls = [u for u in urls if u not in seen]
     if not urls:
         logger.info(f"All URLs in {txt_path.name} are already processed; skipping.")
         return year_month
@@ -306,69 +955,199 @@ async def process_txt_async(
     # ── 3) Now urls contains only new entries; proceed as before ───────────
     success_count = error_count = 0
 
-    async with scraper_class(concurrency=concurrency) as scraper, \
-               aiofiles.open(out_file, "a", encoding="utf-8") as ok_f, \
-               aiofiles.open(err_file, "a", encoding="utf-8") as er_f:
-
-        # Kick off all scrapes
-        scrape_tasks = [asyncio.create_task(scraper.scrape_single_url(u)) for u in urls]
-
-        # Wrap the completion iterator in tqdm
-        with tqdm(
-            total=len(scrape_tasks),
-            desc=f"Scraping URLs in {txt_path.name}",
-            unit="url",
-            leave=False
-        ) as pbar:
-            for coro in asyncio.as_completed(scrape_tasks):
-                item = await coro
-
-                # Determine which file to write to
-                is_error = isinstance(item, tuple) and item and item[0] == "ERROR"
-                target_f = er_f if is_error else ok_f
-
-                # Write & flush
-                await target_f.write(json.dumps(item,  ensure_ascii=ensure_ascii, default=str) + "\n")
-                await target_f.flush()
-
-                # Logging and counters
-                if is_error:
-                    error_count += 1
-                    _, bad_url, msg, _tb = item
-                    logger.error(f"Error scraping {bad_url}: {msg}")
-                else:
-                    success_count += 1
-                    logger.debug(f"Saved {item['article_url']}")
+    async with scraper_class(concurrency=concurrency, shared_browser=shared_browser,
+                             http_client=http_client) as scraper, \
+               aiofiles.open(out_file, "ab") as ok_f, \
+               aiofiles.open(err_file, "ab") as er_f, \
+               aiofiles.open(out_file.with_suffix(".urls"), "ab") as url_f:
 
-                # Advance the progress bar
-                pbar.update(1)
+        # records are batched per file and written in ~1 MB chunks, or every
+        # couple of seconds on slow files; a crash only loses the unwritten
+        # tail, which step 2 re-scrapes next run. The sidecar comes last in
+        # the dict so its URLs never reach disk before their records do.
+        # No temp file + rename: after a crash the partial JSONL is what step 2
+        # resumes from, and a rename only on success would throw it away.
+        bufs = {ok_f: bytearray(), er_f: bytearray(), url_f: bytearray()}
+        last_write = time.monotonic()
+        jsonl_size = out_file.stat().st_size
+
+        async def flush() -> None:
+            nonlocal jsonl_size
+            if bufs[ok_f]:
+                # stamp the JSONL size these URLs bring it to; see
+                # _read_scraped_urls
+                jsonl_size += len(bufs[ok_f])
+                bufs[url_f] += b"#%d\n" % jsonl_size
+            for f, pending in bufs.items():
+                if pending:
+                    await f.write(bytes(pending))
+                    await f.flush()
+                    pending.clear()
+
+        # a fixed set of workers pulls from a bounded queue, so only about
+        # 2 * concurrency URLs are in flight instead of one task per URL.
+        # Every URL must yield exactly one result or the loop below waits
+        # forever, so work() turns anything scrape_single_url raises anyway
+        # into that URL's error record
+        url_q: asyncio.Queue[Optional[str]] = asyncio.Queue(maxsize=2 * concurrency)
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def produce() -> None:
+            for u in urls:
+                await url_q.put(u)
+            for _ in range(concurrency):
+                await url_q.put(None)
+
+        async def work() -> None:
+            while (u := await url_q.get()) is not None:
+                try:
+                    item = await scraper.scrape_single_url(u)
+                except Exception as e:
+                    item = scraper._error_record(u, e)
+                await results.put(item)
+
+        workers = [asyncio.create_task(produce())]
+        workers += [asyncio.create_task(work()) for _ in range(concurrency)]
+
+        try:
+            # Wrap the completion iterator in tqdm
+            with tqdm(
+                total=len(urls),
+                desc=f"Scraping URLs in {txt_path.name}",
+                unit="url",
+                leave=False
+            ) as pbar:
+                for _ in range(len(urls)):
+                    item = await results.get()
+
+                    # Determine which file to write to
+                    is_error = isinstance(item, tuple) and item and item[0] == "ERROR"
+                    target_f = er_f if is_error else ok_f
+
+                    buf = bufs[target_f]
+                    buf += _dump_line(item, ensure_ascii)
+                    if not is_error:
+                        bufs[url_f] += item["article_url"].encode("utf-8") + b"\n"
+                    if len(buf) >= 1 << 20 or time.monotonic() - last_write >= 2.0:
+                        await flush()
+                        last_write = time.monotonic()
+
+                    # Logging and counters
+                    if is_error:
+                        error_count += 1              # logged by _error_record
+                    else:
+                        success_count += 1
+                        if seen_filter is not None:
+                            seen_filter.add(item["article_url"])
+                        logger.debug(f"Saved {item['article_url']}")
+
+                    # Advance the progress bar
+                    pbar.update(1)
+        finally:
+            for w in workers:
+                w.cancel()
+            # flush even on error: the seen filter already holds these URLs
+            await flush()
 
     logger.info(
         f"Completed {txt_path.name}: {success_count} ok, {error_count} errors"
     )
     return year_month
 
-def _run_one_file(txt_file: pathlib.Path,
-                  out_dir: pathlib.Path,
-                  err_dir: pathlib.Path,
-                  seen_dir: pathlib.Path,
-                  concurrency: int) -> str:
+def _build_seen_filter(out_dir: pathlib.Path, capacity: int = DEFAULT_CAPACITY) -> BloomFilter:
+    """A filter over every .jsonl in out_dir, sized up until the URLs fit."""
+    seen_filter = BloomFilter(capacity)
+    for jsonl in out_dir.glob("*.jsonl"):
+        for url in _iter_article_urls(jsonl):
+            seen_filter.add(url)
+    if seen_filter.saturated:
+        return _build_seen_filter(out_dir, 2 * seen_filter.count)
+    logger.info(f"Built URL filter from {out_dir} ({seen_filter.count} URLs)")
+    return seen_filter
+
+def load_seen_filter(bloom_path: pathlib.Path, out_dir: pathlib.Path) -> BloomFilter:
     """
-    This is executed in a *separate* process.
-    We call asyncio.run(...) because process pools are not async-aware.
+    Load the persisted filter, or build it from every .jsonl in out_dir when
+    it's missing, unreadable, or holds more URLs than it was sized for.
+
+    The filter is only saved when a run ends, so after a crash it misses that
+    run's records: every .jsonl written to since the save (mtime not older
+    than the filter's, so a tie counts as newer) is added back in.
     """
+    if not bloom_path.exists():
+        return _build_seen_filter(out_dir)
     try:
-        # do the actual scraping
-        asyncio.run(
-            process_txt_async(txt_file, out_dir, err_dir,
-                              concurrency, ST_Scraper)
+        saved_at = bloom_path.stat().st_mtime_ns
+        seen_filter = BloomFilter.fromfile(bloom_path)
+    except ValueError as e:
+        logger.warning(f"Rebuilding the URL filter: {e}")
+        return _build_seen_filter(out_dir)
+
+    for jsonl in out_dir.glob("*.jsonl"):
+        if jsonl.stat().st_mtime_ns >= saved_at:
+            for url in _iter_article_urls(jsonl):
+                if url not in seen_filter:
+                    seen_filter.add(url)
+            logger.info(f"Added {jsonl.name} to the URL filter (written since it was saved)")
+
+    if seen_filter.saturated:
+        logger.warning(
+            f"URL filter holds {seen_filter.count} URLs, past its capacity of "
+            f"{seen_filter.capacity}; rebuilding it larger"
         )
-        # move to seen/  (atomic rename)
-        txt_file.rename(seen_dir / txt_file.name)
-        return f"✔ {txt_file.name}"
-    except Exception as e:
-        logger.error(f"Worker failed on {txt_file}: {e}", exc_info=True)
-        return f"✖ {txt_file.name}: {e}"
+        return _build_seen_filter(out_dir, max(DEFAULT_CAPACITY, 2 * seen_filter.count))
+    return seen_filter
+
+async def process_files_async(
+    txt_files: List[pathlib.Path],
+    out_dir: pathlib.Path,
+    err_dir: pathlib.Path,
+    seen_dir: pathlib.Path,
+    concurrency: int = 5,
+    file_parallel: int = 4,
+    scraper_class: type=ST_Scraper,
+    ensure_ascii: bool=True,
+    bloom_path: Optional[pathlib.Path]=None
+) -> None:
+    """
+    Scrape many .txt files on one event loop, all sharing one browser and
+    one HTTP client (so keep-alive connections and TLS sessions carry over
+    from file to file).
+    file_parallel bounds how many files are in flight; each file still gets
+    its own contexts (so cookies stay per file) and `concurrency` pages.
+    With bloom_path, URLs already scraped into any file in out_dir (this run
+    or an earlier one) are skipped; the filter is saved back at the end.
+    """
+    seen_filter = load_seen_filter(bloom_path, out_dir) if bloom_path else None
+    shared_browser = SharedBrowser(renderers=concurrency * file_parallel)
+    http_client = _new_http_client(concurrency * file_parallel)
+    file_sem = asyncio.Semaphore(file_parallel)
+    pbar = tqdm(total=len(txt_files), desc="Files")
+
+    async def run_one(txt_file: pathlib.Path) -> None:
+        async with file_sem:
+            try:
+                await process_txt_async(txt_file, out_dir, err_dir, concurrency,
+                                        scraper_class, ensure_ascii, shared_browser,
+                                        seen_filter, http_client)
+                # move to seen/  (atomic rename)
+                txt_file.rename(seen_dir / txt_file.name)
+                logger.info(f"✔ {txt_file.name}")
+            except Exception as e:
+                logger.error(f"Worker failed on {txt_file}: {e}", exc_info=True)
+            finally:
+                pbar.update(1)
+
+    try:
+        await asyncio.gather(*(run_one(f) for f in txt_files))
+    finally:
+        pbar.close()
+        await shared_browser.close()
+        await http_client.aclose()
+        # workers are idle by now, so waiting for them is quick
+        await asyncio.to_thread(_shutdown_parse_pool)
+        if seen_filter is not None:
+            seen_filter.tofile(bloom_path)
 
 
 def main() -> None:
@@ -390,26 +1169,25 @@ def main() -> None:
         logger.warning("No .txt files to process")
         return
 
-    logger.info(f"Submitting {len(txt_files)} files to the pool "
-                f"({MAX_PARALLEL_TXT_FILES} workers)")
+    logger.info(f"Scraping {len(txt_files)} files, "
+                f"{MAX_PARALLEL_TXT_FILES} at a time on one shared browser")
 
-    worker = functools.partial(
-        _run_one_file,
-        out_dir=OUT_DIR,
-        err_dir=ERR_DIR,
-        seen_dir=SEEN_DIR,
-        concurrency=CONCURRENCY_IN_FILE,
+    # one event loop + one Chromium for every file, instead of a browser per
+    # worker process; the HTML parsing still fans out to the parse pool
+    aio.run(
+        process_files_async(
+            txt_files,
+            OUT_DIR,
+            ERR_DIR,
+            SEEN_DIR,
+            concurrency=CONCURRENCY_IN_FILE,
+            file_parallel=MAX_PARALLEL_TXT_FILES,
+            scraper_class=ST_Scraper,
+            ensure_ascii=False,
+            bloom_path=BASE_DIR / "seen.bf",
+        )
     )
 
-    with concurrent.futures.ProcessPoolExecutor(
-            max_workers=MAX_PARALLEL_TXT_FILES,
-            mp_context=None  # use default 'spawn' on Windows, 'fork' on *nix
-    ) as pool:
-        for result in tqdm(pool.map(worker, txt_files),
-                           total=len(txt_files),
-                           desc="Files"):
-            logger.info(result)
-
     logger.info("All files processed!")
 
 
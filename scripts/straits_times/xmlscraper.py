@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 import asyncio
+import io
 import re
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, Iterator, List, Optional, Tuple
 import httpx
-from bs4 import BeautifulSoup
+from lxml import etree
+from ...utils import aio
 
 ## scrapes from the xml sitemap, takes only monthly feedsusing the below re patter
 ## excludes this month's feed
@@ -15,8 +17,105 @@ from bs4 import BeautifulSoup
 
 MONTH_FEED_RE = re.compile(r"/(\d{4})/(\d{2})/feeds\.xml$")   # keep only YYYY/MM feeds
 
+
+def _iter_locs(content: bytes, parent: Optional[str] = None) -> Iterator[str]:
+    """
+    Stream the <loc> texts out of a sitemap. Entries already read are dropped
+    from the tree as we go, so memory stays flat however big the file is.
+    With parent, only <loc>s whose parent element has that name are kept
+    (e.g. "sitemap" for the entries of a sitemap index).
+    """
+    return _locs_from_events(
+        etree.iterparse(io.BytesIO(content), events=("end",),
+                        tag="{*}loc", recover=True),
+        parent,
+    )
+
+
+def _loc_pull_parser() -> etree.XMLPullParser:
+    """
+    Incremental counterpart of _iter_locs: feed() it the body as it arrives
+    and pass read_events() to _locs_from_events.
+    """
+    return etree.XMLPullParser(events=("end",), tag="{*}loc", recover=True)
+
+
+def _locs_from_events(events: Iterable, parent: Optional[str] = None) -> Iterator[str]:
+    for _, loc in events:
+        entry = loc.getparent()
+        if parent is None or etree.QName(entry).localname == parent:
+            yield (loc.text or "").strip()
+        loc.clear()
+        while entry.getprevious() is not None:
+            del entry.getparent()[0]
+
+def _write_urls(outpath: Path, first: str, urls: Iterator[str]) -> int:
+    """
+    Write first + urls to outpath, one per line, as the parser yields them:
+    no list of URLs, no joined copy. Returns the number of lines written.
+    """
+    count = 1
+    with open(outpath, "w", encoding="utf-8") as f:
+        f.write(first)
+        for url in urls:
+            f.write("\n" + url)
+            count += 1
+    return count
+
+class SitemapClientMixin:
+    """
+    The HTTP client and dump() entry points shared by the sitemap scrapers.
+    The dataclass using it supplies timeout, max_concurrency and dump_async().
+    """
+    _client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """One client per scraper, kept across dump_async calls until aclose()."""
+        if self._client is None or self._client.is_closed:
+            # HTTP/2 multiplexes the feed requests over one connection;
+            # httpx already advertises gzip (and br when brotli is installed).
+            # The transport retries failed connects, so a dropped connection
+            # mid-crawl doesn't cost a whole feed
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                transport=httpx.AsyncHTTPTransport(
+                    http2=True,
+                    retries=2,
+                    limits=httpx.Limits(
+                        max_keepalive_connections=self.max_concurrency,
+                        max_connections=self.max_concurrency * 2,
+                    ),
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _dump_and_close(self) -> None:
+        try:
+            await self.dump_async()
+        finally:
+            # the client's connections belong to this loop, which ends here
+            await self.aclose()
+
+    def dump(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:           # no loop → we're in a vanilla script
+            loop = None
+
+        if loop and loop.is_running():
+            # notebook / web-server context → create and return a Task
+            return asyncio.create_task(self._dump_and_close())
+        else:
+            # classic script → safe to spin up a fresh loop
+            aio.run(self._dump_and_close())
+
 @dataclass
-class XMLScraper:
+class XMLScraper(SitemapClientMixin):
     index_url: str
     out_dir: Path | str = "/home/leeeefun681/volume/eefun/webscraping/sitemap/sitemap_scrape/data/straitsTimes/st_sitemaps"
     timeout: float = 15.0
@@ -30,58 +129,55 @@ class XMLScraper:
         self.out_dir = Path(self.out_dir)
         self.out_dir.mkdir(parents=True, exist_ok=True)
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            month_feeds = await self._sitemap_links(client)
+        client = self._get_client()
+        month_feeds = await self._sitemap_links(client)
 
-            if not month_feeds:
-                print("No month feeds found (or all filtered out).")
-                return
+        if not month_feeds:
+            print("No month feeds found (or all filtered out).")
+            return
 
-            sem = asyncio.Semaphore(self.max_concurrency)
-            tasks = [
-                asyncio.create_task(self._process_month(feed_url, client, sem))
-                for feed_url in month_feeds
-            ]
-            await asyncio.gather(*tasks)
+        # max_concurrency workers drain a queue of feeds, instead of one
+        # task per feed all waiting on a semaphore
+        queue: asyncio.Queue[Tuple[str, str, str]] = asyncio.Queue()
+        for feed in month_feeds:
+            queue.put_nowait(feed)
 
-    def dump(self):
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:           # no loop → we're in a vanilla script
-            loop = None
+        async def worker() -> None:
+            while not queue.empty():
+                feed_url, yr, mo = queue.get_nowait()
+                try:
+                    await self._process_month(feed_url, yr, mo, client)
+                except Exception as e:
+                    # a bad feed (malformed XML, a write error) is reported
+                    # and skipped; the worker moves on to the next month
+                    print("   ERR ·", feed_url, "→", repr(e))
 
-        if loop and loop.is_running():
-            # notebook / web-server context → create and return a Task
-            return asyncio.create_task(self.dump_async())
-        else:
-            # classic script → safe to spin up a fresh loop
-            asyncio.run(self.dump_async())
+        await asyncio.gather(*(worker() for _ in range(self.max_concurrency)))
 
     # ────────────────────────── internals ───────────────────────────────────
-    async def _sitemap_links(self, client: httpx.AsyncClient) -> List[str]:
-        """Return monthly feeds, filtering out current month & sections.xml."""
+    async def _sitemap_links(self, client: httpx.AsyncClient) -> List[Tuple[str, str, str]]:
+        """
+        Return (feed_url, YYYY, MM) for the monthly feeds, filtering out the
+        current month & sections.xml. The date parts name the output file.
+        """
         r = await client.get(self.index_url)
         r.raise_for_status()
 
-        soup = BeautifulSoup(r.content, "xml")
-        raw_links = [
-            loc.get_text(strip=True)
-            for loc in soup.find_all("loc")
-            if loc.parent.name == "sitemap"
-        ]
+        raw_links = list(_iter_locs(r.content, parent="sitemap"))
 
         # figure out YYYY/MM for 'today' (Singapore time is irrelevant for month test)
-        y_now, m_now = datetime.now(timezone.utc).year, datetime.now(timezone.utc).month
+        now = datetime.now(timezone.utc)
+        y_now, m_now = now.year, now.month
 
-        feeds: list[str] = []
+        feeds: list[Tuple[str, str, str]] = []
         for link in raw_links:
             m = MONTH_FEED_RE.search(link)
             if not m:                          # skips sections.xml & anything odd
                 continue
-            yr, mo = int(m.group(1)), int(m.group(2))
-            if (yr, mo) == (y_now, m_now):     # skip current month
+            yr, mo = m.group(1), m.group(2)
+            if (int(yr), int(mo)) == (y_now, m_now):     # skip current month
                 continue
-            feeds.append(link)
+            feeds.append((link, yr, mo))
 
         return feeds
 
@@ -91,36 +187,37 @@ class XMLScraper:
         """Return every <loc> article URL from a single feeds.xml."""
         r = await client.get(feed_url)
         r.raise_for_status()
-        soup = BeautifulSoup(r.content, "xml")
-        return (loc.get_text(strip=True) for loc in soup.find_all("loc"))
+        return _iter_locs(r.content)
 
     async def _process_month(
         self,
         feed_url: str,
+        yr: str,
+        mo: str,
         client: httpx.AsyncClient,
-        sem: asyncio.Semaphore,
     ) -> None:
         """Download one month feed, write out its TXT file."""
-        async with sem:                 # limit concurrent requests
-            try:
-                urls = list(await self._month_urls(feed_url, client))
-            except httpx.HTTPError as e:
-                print("   ERR ·", feed_url, "→", e)
-                return
-
-            if not urls:
-                print("   0   · (empty) ·", feed_url)
-                return
-
-            # derive filename st_YYYY_MM.txt from the URL
-            m = MONTH_FEED_RE.search(feed_url)
-            fname = f"{self.abbrev}_{m.group(1)}_{m.group(2)}.txt"
-            outpath = self.out_dir / fname
-            outpath.write_text("\n".join(urls), encoding="utf-8")
-
-            print(f"{len(urls):5d} · {outpath.relative_to(self.out_dir)}")
-            await asyncio.sleep(self.polite_delay)  # respectful crawl 
-            
+        try:
+            urls = iter(await self._month_urls(feed_url, client))
+        except httpx.HTTPError as e:
+            print("   ERR ·", feed_url, "→", e)
+            return
+
+        first = next(urls, None)
+        if first is None:
+            print("   0   · (empty) ·", feed_url)
+            return
+
+        # filename st_YYYY_MM.txt, from the date _sitemap_links already matched
+        fname = f"{self.abbrev}_{yr}_{mo}.txt"
+        outpath = self.out_dir / fname
+        # parsing the rest of the feed and writing it out runs in a thread, so
+        # the other months' downloads keep going while a big file is written
+        count = await asyncio.to_thread(_write_urls, outpath, first, urls)
+
+        print(f"{count:5d} · {outpath.relative_to(self.out_dir)}")
+        await asyncio.sleep(self.polite_delay)  # respectful crawl 
+        
 def main():
     extractor = XMLScraper(
         index_url="https://www.straitstimes.com/sitemap.xml",
@@ -5,99 +5,76 @@ from bs4 import BeautifulSoup, Tag
 from typing import Any, Dict, List, Optional
 import traceback
 import asyncio, json, pathlib, traceback, random, re
-from ..straits_times.st_scraper import ST_Scraper, process_txt_async  # adjust import path as needed
+from ..straits_times.st_scraper import ST_Scraper, process_files_async, _resolve_url, _parse_date  # adjust import path as needed
 import concurrent.futures
 from ...utils.logger import logger
+from ...utils import aio
 from tqdm.auto import tqdm
 
+# one srcset candidate: URL, optional "<digits>w" width, then any other
+# descriptor (e.g. "2x") up to the next comma
+_SRCSET_RE = re.compile(r'([^\s,]+)(?:\s+(\d+)w)?[^,]*')
+_CAROUSEL_RE = re.compile(r"^article-carousel-wrapper-\d+$")
+
 
 class Tabla_Scraper(ST_Scraper):
     """Extends ST_Scraper to extract dates from dropdown buttons
     and images from article carousels."""
 
-    async def scrape_single_url(self, url: str) -> Dict[str, Any]:
-        result = await super().scrape_single_url(url)
-        # If super returned an error tuple, propagate
-        if isinstance(result, tuple) and result and result[0] == "ERROR":
-            return result
-
-        try:
-            soup: BeautifulSoup = await self._fetch_page_content(url)
-            article = soup.find("article")
-            if not article:
-                raise RuntimeError("No <article> tag found for custom scraping")
-
-            # Override publish_date extraction
-            pub_date = None
-            btn = article.find("button", class_="dropdown-button flex leading-7")
-            if btn:
-                p_tag = btn.find("p")
-                if p_tag and p_tag.get_text(strip=True):
-                    raw = p_tag.get_text(strip=True)
-                    try:
-                        pub_date = dateparser.parse(raw).isoformat()
-                    except (ValueError, TypeError):
-                        pub_date = None
-
-            # Override images extraction
-            images: List[Dict[str, Any]] = []
-            wrappers = article.find_all(
-                "div", class_=re.compile(r"^article-carousel-wrapper-\d+$")
-            )
-            for wrapper in wrappers:
-                # find caption text from div.text-grey-200 if present
-                caption_tag = wrapper.find("div", class_="text-grey-200")
-                caption = caption_tag.get_text(strip=True) if caption_tag else None
-
-                # collect all img tags inside this wrapper
-                for img in wrapper.find_all("img"):
-                    # parse highest-res URL from srcset if present
-                    url_to_use = None
-                    if img.has_attr("srcset"):
-                        candidates = [s.strip() for s in img["srcset"].split(",")]
-                        max_width = 0
-                        for cand in candidates:
-                            parts = cand.split()
-                            if len(parts) >= 2 and parts[-1].endswith("w"):
-                                try:
-                                    width = int(parts[-1][:-1])
-                                except ValueError:
-                                    width = 0
-                                if width > max_width:
-                                    max_width = width
-                                    url_to_use = parts[0]
-                        # fallback: first URL
-                        if not url_to_use and candidates:
-                            url_to_use = candidates[0].split()[0]
-                    else:
-                        url_to_use = img.get("src") or img.get("data-src")
-
-                    if url_to_use:
-                        full_url = urljoin(url, url_to_use)
-                        images.append({
-                            "image_url": full_url,
-                            "alt_text": caption
-                        })
-
-            # Merge into result
-            result["publish_date"] = pub_date
-            result["images"] = images
-            return result
-
-        except Exception as e:
-            return ("ERROR", url, repr(e), traceback.format_exc())
-
-
-def process_single_file(txt_file: pathlib.Path, OUT_DIR, ERR_DIR, SEEN_DIR, CONCURRENCY):
-    try:
-        result = asyncio.run(process_txt_async(txt_file, OUT_DIR, ERR_DIR, CONCURRENCY, Tabla_Scraper, False))
-        seen_path = SEEN_DIR / txt_file.name
-        txt_file.rename(seen_path)
-        return f"Processed {txt_file.name}"
-    except Exception as e:
-        logger.error(f"Error processing {txt_file}: {e}", exc_info=True)
-        return f"Error in {txt_file.name}: {e}"
-    
+    def _extract_publish_date(self, soup: BeautifulSoup, article: Tag, url: str) -> Optional[str]:
+        # the date sits in the dropdown button at the top of the article
+        pub_date = None
+        btn = article.find("button", class_="dropdown-button flex leading-7")
+        if btn:
+            p_tag = btn.find("p")
+            if p_tag and p_tag.get_text(strip=True):
+                raw = p_tag.get_text(strip=True)
+                try:
+                    pub_date = _parse_date(raw)
+                except (ValueError, TypeError):
+                    pub_date = None
+        return pub_date
+
+    def _extract_images(self, article: Tag, url: str) -> List[Dict[str, Any]]:
+        # Override images extraction
+        images: List[Dict[str, Any]] = []
+        wrappers = article.find_all("div", class_=_CAROUSEL_RE)
+        for wrapper in wrappers:
+            # find caption text from div.text-grey-200 if present
+            caption_tag = wrapper.find("div", class_="text-grey-200")
+            caption = caption_tag.get_text(strip=True) if caption_tag else None
+
+            # collect all img tags inside this wrapper
+            for img in wrapper.find_all("img"):
+                # parse highest-res URL from srcset if present
+                url_to_use = None
+                if img.has_attr("srcset"):
+                    max_width = 0
+                    first_url = None
+                    # single pass over the attribute, no split/strip lists
+                    for m in _SRCSET_RE.finditer(img["srcset"]):
+                        cand_url, w_str = m.groups()
+                        if first_url is None:
+                            first_url = cand_url
+                        width = int(w_str) if w_str else 0
+                        if width > max_width:
+                            max_width = width
+                            url_to_use = cand_url
+                    # fallback: first URL
+                    if not url_to_use:
+                        url_to_use = first_url
+                else:
+                    url_to_use = img.get("src") or img.get("data-src")
+
+                if url_to_use:
+                    full_url = _resolve_url(url, url_to_use)
+                    images.append({
+                        "image_url": full_url,
+                        "alt_text": caption
+                    })
+        return images
+
+
 def main():
     BASE_DIR = pathlib.Path("/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/tabla")
     UNSEEN_DIR = BASE_DIR / "unseen"
@@ -116,18 +93,25 @@ def main():
         return
     
     CONCURRENCY = 20
-    MAX_PARALLEL_TXT_FILES = len(txt_files)  # Number of files to process in parallel
+    MAX_PARALLEL_TXT_FILES = 4  # .txt files in flight at once on the shared browser
 
     logger.info(f"Found {len(txt_files)} files to process")
 
-    with concurrent.futures.ProcessPoolExecutor(max_workers=MAX_PARALLEL_TXT_FILES) as executor:
-        futures = [
-            executor.submit(process_single_file, txt_file, OUT_DIR, ERR_DIR, SEEN_DIR, CONCURRENCY)
-            for txt_file in txt_files
-        ]
-        for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="Parallel processing"):
-            result = future.result()
-            logger.info(result)
+    # one event loop + one Chromium for every file, instead of a browser per
+    # worker process
+    aio.run(
+        process_files_async(
+            txt_files,
+            OUT_DIR,
+            ERR_DIR,
+            SEEN_DIR,
+            concurrency=CONCURRENCY,
+            file_parallel=MAX_PARALLEL_TXT_FILES,
+            scraper_class=Tabla_Scraper,
+            ensure_ascii=False,
+            bloom_path=BASE_DIR / "seen.bf",
+        )
+    )
 
     logger.info("All files processed!")
 
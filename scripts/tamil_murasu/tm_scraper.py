@@ -1,15 +1,28 @@
 from urllib.parse import urljoin, urlparse, parse_qs
 from bs4 import BeautifulSoup, Tag
 from dateutil import parser as dateparser
+from datetime import date, datetime
 from typing import Any, Dict, List, Optional
 import asyncio, json, pathlib, traceback, random, re
 from tqdm.auto import tqdm
 import concurrent.futures
 from ...utils.logger import logger
-from ..straits_times.st_scraper import ST_Scraper, process_txt_async
+from ...utils import aio
+from ..straits_times.st_scraper import ST_Scraper, process_files_async, _resolve_url, _img_parent
+
+# the "storyYYYYMMDD" segment article URLs carry their date in
+_STORY_DATE_RE = re.compile(r"story(\d{4})(\d{2})(\d{2})")
+# the on-page <p data-testid="date"> text, e.g. "01 Jul 2025 - 8:39 pm"
+_DATE_TAG_FORMAT = "%d %b %Y - %I:%M %p"
+# marks a lookup not done yet, where None is a valid result
+_UNSET = object()
 
 class TM_Scraper(ST_Scraper):
-    
+    # the fallback date is read from a <p data-testid="date"> outside <article>,
+    # and an image's caption can be the first <figcaption> after it, wherever
+    # that is on the page
+    page_selectors = ST_Scraper.page_selectors + ('p[data-testid="date"]', "figcaption")
+    max_retries = 3
 
     def _is_data_uri(self, u: str) -> bool:
         return u.strip().lower().startswith("data:")
@@ -18,135 +31,130 @@ class TM_Scraper(ST_Scraper):
         best_url = None
         best_w   = -1
 
-        for candidate in srcset.split(","):
-            url, *rest = candidate.strip().split()
-            if self._is_data_uri(url):          # ← ignore embedded data URLs
+        # one left-to-right pass with str.find: no list per candidate, and no
+        # int() to blow up on an odd descriptor or an empty candidate
+        i, n = 0, len(srcset)
+        while i < n:
+            end = srcset.find(",", i)
+            if end == -1:
+                end = n
+            candidate = srcset[i:end].strip()
+            i = end + 1
+            if not candidate:
+                continue
+            if candidate[:5].lower() == "data:":    # ← ignore embedded data URLs
+                if " " not in candidate:
+                    # cut at the URI's own comma: its payload is the next
+                    # piece, so skip that too
+                    end = srcset.find(",", i)
+                    i = n if end == -1 else end + 1
                 continue
 
-            w = int(rest[0][:-1]) if rest and rest[0].endswith("w") else -1
-            if w > best_w:
-                best_url, best_w = url, w
+            sp = candidate.rfind(" ")
+            if sp == -1:
+                continue                            # no descriptor: width -1
+            desc = candidate[sp + 1:]
+            if desc[-1:] == "w" and desc[:-1].isdigit():
+                w = int(desc[:-1])
+                if w > best_w:
+                    best_url, best_w = candidate[:sp].rstrip(), w
 
         return best_url
 
 
-    async def scrape_single_url(self, url: str) -> Dict[str, Any]:
-        """Scrape a single URL for article content, metadata, images, and generate summary."""
-        logger.debug(f"Starting scrape for URL: {url}")
-        
-        try:
-            max_retries = 3
-            for attempt in range(max_retries):
-                soup = await self._fetch_page_content(url)
-                if soup and soup.find("article"):
-                    logger.info(f"Article successfully found {url}")
-                    break
-                logger.info(f"Retrying {url}")
-                
-            article = soup.find("article")
-            if not article:
-                logger.error(f"No <article> tag found in {url}")
-                raise RuntimeError("No <article> tag found")
-
-            # Title
-            h1 = article.find("h1")
-            title = (
-                h1.get_text(strip=True)
-                if h1
-                else (soup.title.string.strip() if soup.title else "(untitled)")
-            )
-
-            # ——— Published date (from the URL) ———
-            pub_date = None
-            m = re.search(r"story(\d{8})", url)
-            if m:
+    def _extract_publish_date(self, soup: BeautifulSoup, article: Tag, url: str) -> Optional[str]:
+        # ——— Published date (from the URL) ———
+        pub_date = None
+        m = _STORY_DATE_RE.search(url)
+        if m:
+            try:
+                # “YYYYMMDD” is fixed-width digits: build the date straight
+                # from the three groups (date() still rejects e.g. month 13)
+                pub_date = date(*map(int, m.groups())).isoformat()
+            except Exception:
+                pub_date = None
+
+        # ——— Fallback: scrape the on‑page <p data-testid="date"> ———
+        if not pub_date:
+            # assume you've already done: soup = BeautifulSoup(html, "lxml")
+            date_tag = soup.find("p", {"data-testid": "date"})
+            if date_tag:
+                # extract text like “01 Jul 2025 - 8:39 pm”
+                raw = date_tag.get_text(" ", strip=True)
                 try:
-                    # parse “YYYYMMDD” into a date and iso‑format it
-                    dt = dateparser.parse(m.group(1))
-                    pub_date = dt.date().isoformat()
-                except Exception:
-                    pub_date = None
-
-            # ——— Fallback: scrape the on‑page <p data-testid="date"> ———
-            if not pub_date:
-                # assume you've already done: soup = BeautifulSoup(html, "html.parser")
-                date_tag = soup.find("p", {"data-testid": "date"})
-                if date_tag:
-                    # extract text like “01 Jul 2025 - 8:39 pm”
-                    raw = date_tag.get_text(" ", strip=True)
                     try:
+                        dt2 = datetime.strptime(raw, _DATE_TAG_FORMAT)
+                    except ValueError:
                         dt2 = dateparser.parse(raw)
-                        # if you only want the date part:
-                        pub_date = dt2.date().isoformat()
-                        # or for full timestamp: pub_date = dt2.isoformat()
-                    except Exception:
-                        pub_date = None
-
-            # Extract and clean content
-            content = self._clean_content(article)
-
-            images = []
-            seen   = set()
-
-            for img in article.find_all("img", src=True):
-                # choose the “best” URL
-                if "srcset" in img.attrs:
-                    img_url = self._pick_largest_from_srcset(img["srcset"])
-                else:
-                    img_url = img["src"]
-
-                if not img_url or self._is_data_uri(img_url):   # ← filter here too
-                    continue
+                    # if you only want the date part:
+                    pub_date = dt2.date().isoformat()
+                    # or for full timestamp: pub_date = dt2.isoformat()
+                except Exception:
+                    pub_date = None
+        return pub_date
+
+    def _extract_images(self, article: Tag, url: str) -> List[Dict[str, Any]]:
+        images = []
+        seen   = set()
+
+        # one backwards pass in document order gives every <img> the first
+        # <figcaption> after it, instead of a find_next scan per image
+        next_figcap: Dict[int, Optional[Tag]] = {}
+        following = None
+        for tag in reversed(article.find_all(["img", "figcaption"])):
+            if tag.name == "figcaption":
+                following = tag
+            else:
+                next_figcap[id(tag)] = following
+        after_article = _UNSET    # first <figcaption> past the article, looked up once
+        wrappers: Dict[int, Optional[Tag]] = {}   # id(parent) → caption wrapper
+
+        for img in article.find_all("img", src=True):
+            # choose the “best” URL
+            if "srcset" in img.attrs:
+                img_url = self._pick_largest_from_srcset(img["srcset"])
+            else:
+                img_url = img["src"]
+
+            if not img_url or self._is_data_uri(img_url):   # ← filter here too
+                continue
 
-                img_url = urljoin(url, img_url)
-                if img_url in seen:
-                    continue
+            img_url = _resolve_url(url, img_url)
+            if img_url in seen:
+                continue
 
-                seen.add(img_url)
+            seen.add(img_url)
 
-                # 2) alt text --------------------------------------------------
-                alt = img.get("alt") or None
+            # 2) alt text --------------------------------------------------
+            alt = img.get("alt") or None
 
-                # 3) try to pick up a caption nearby (two common layouts) -----
-                cap_div = img.find_parent().find(
+            # 3) try to pick up a caption nearby (two common layouts) -----
+            parent = _img_parent(img)
+            if id(parent) not in wrappers:
+                wrappers[id(parent)] = parent.find(
                     "div", {"data-testid": "image-caption-wrapper"}
                 )
-                if cap_div:
-                    caption = cap_div.get_text(" ", strip=True)
-                else:
-                    figcap = img.find_next("figcaption")
-                    caption = figcap.get_text(" ", strip=True) if figcap else None
-
-                images.append(
-                    {
-                        "image_url": img_url,
-                        "alt_text":  alt,
-                        "caption":   caption or None,
-                    }
-                )
+            cap_div = wrappers[id(parent)]
+            if cap_div:
+                caption = cap_div.get_text(" ", strip=True)
+            else:
+                figcap = next_figcap[id(img)]
+                if figcap is None:
+                    if after_article is _UNSET:
+                        after_article = img.find_next("figcaption")
+                    figcap = after_article
+                caption = figcap.get_text(" ", strip=True) if figcap else None
+
+            images.append(
+                {
+                    "image_url": img_url,
+                    "alt_text":  alt,
+                    "caption":   caption or None,
+                }
+            )
+
+        return images
 
-            return {
-                "article_url":   url,
-                "site_title":    title,
-                "publish_date":  pub_date,
-                "content":       content,
-                "images":        images,
-            }
-            
-        except Exception as e:
-            logger.error(f"Error scraping {url}: {e}", exc_info=True)
-            return ("ERROR", url, repr(e), traceback.format_exc())
-
-
-def process_single_file(txt_file: pathlib.Path, OUT_DIR, ERR_DIR, SEEN_DIR, CONCURRENCY):
-    try:
-        result = asyncio.run(process_txt_async(txt_file, OUT_DIR, ERR_DIR, CONCURRENCY, TM_Scraper, False))
-        seen_path = SEEN_DIR / txt_file.name
-        txt_file.rename(seen_path)
-        return f"Processed {txt_file.name}"
-    except Exception as e:
-        logger.error(f"Error processing {txt_file}: {e}", exc_info=True)
-        return f"Error in {txt_file.name}: {e}"
 
 def main():
     BASE_DIR = pathlib.Path("/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/tamil_murasu")
@@ -170,14 +178,21 @@ def main():
 
     logger.info(f"Found {len(txt_files)} files to process")
 
-    with concurrent.futures.ProcessPoolExecutor(max_workers=MAX_PARALLEL_TXT_FILES) as executor:
-        futures = [
-            executor.submit(process_single_file, txt_file, OUT_DIR, ERR_DIR, SEEN_DIR, CONCURRENCY)
-            for txt_file in txt_files
-        ]
-        for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="Parallel processing"):
-            result = future.result()
-            logger.info(result)
+    # one event loop + one Chromium for every file, instead of a browser per
+    # worker process
+    aio.run(
+        process_files_async(
+            txt_files,
+            OUT_DIR,
+            ERR_DIR,
+            SEEN_DIR,
+            concurrency=CONCURRENCY,
+            file_parallel=MAX_PARALLEL_TXT_FILES,
+            scraper_class=TM_Scraper,
+            ensure_ascii=False,
+            bloom_path=BASE_DIR / "seen.bf",
+        )
+    )
 
     logger.info("All files processed!")
 
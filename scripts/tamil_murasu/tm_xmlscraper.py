@@ -1,10 +1,9 @@
-from ..berita_harian.bh_xmlscraper import BH_XMLScraper
+from ..berita_harian.bh_xmlscraper import BH_XMLScraper, _loc_urls
 from ...utils.logger import logger
 import httpx
 from tqdm.auto import tqdm
 from typing import Iterable, List
 from urllib.parse import urlparse, urlunparse
-from bs4 import BeautifulSoup
 
 
 class TM_XMLScraper(BH_XMLScraper):
@@ -17,8 +16,7 @@ class TM_XMLScraper(BH_XMLScraper):
 
         resp = await client.get(feed_url)
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.content, "xml")
-        return (loc.text.strip() for loc in soup.find_all("loc"))
+        return _loc_urls(resp.content)
 
 if __name__ == "__main__":
     scraper = TM_XMLScraper(
@@ -1,14 +1,22 @@
 from urllib.parse import urljoin, urlparse, parse_qs
 from bs4 import BeautifulSoup, Tag
 from dateutil import parser as dateparser
+from datetime import date
 from typing import Any, Dict, List, Optional
 import asyncio, json, pathlib, traceback, random, re
 from tqdm.auto import tqdm
 from playwright.async_api import async_playwright, Browser, BrowserContext
 from ...utils.logger import logger
-from ..straits_times.st_scraper import ST_Scraper, process_txt_async
+from ...utils import aio
+from ..straits_times.st_scraper import ST_Scraper, process_files_async, _resolve_url, _img_parent
+
+# the "storyYYYYMMDD" segment article URLs carry their date in
+_STORY_DATE_RE = re.compile(r"story(\d{4})(\d{2})(\d{2})")
+# any class containing "articleBody" (the body div's class carries a suffix)
+_ARTICLE_BODY_RE = re.compile("articleBody")
 
 class ZB_Scraper(ST_Scraper):
+    max_retries = 3
 
     def _extract_images(self, container: Tag, page_url: str) -> List[Dict[str, Any]]:
         """
@@ -19,11 +27,12 @@ class ZB_Scraper(ST_Scraper):
         images: List[Dict[str, Any]] = []
         seen_srcs = set()
         
-        btn = container.find("button", class_=lambda c: c and "w-full" in c.split()) if container else None
+        # bs4 matches class_ against each class of a tag, already split
+        btn = container.find("button", class_="w-full") if container else None
         if btn:
             img = btn.find("img", src=True)
             if img:
-                src = urljoin(page_url, img["src"])
+                src = _resolve_url(page_url, img["src"])
                 if not src.startswith("data:") and src not in seen_srcs:
                     seen_srcs.add(src)
                     images.append({
@@ -34,10 +43,10 @@ class ZB_Scraper(ST_Scraper):
         
 
         # --- 2) In-article images ---
-        body = container.find("div", class_=lambda c: c and "articleBody" in c) if container else None
+        body = container.find("div", class_=_ARTICLE_BODY_RE) if container else None
         if body:
             for img in body.find_all("img", src=True):
-                src = urljoin(page_url, img["src"])
+                src = _resolve_url(page_url, img["src"])
                 # skip icons, duplicates, data URIs
                 if src.startswith("data:") or src in seen_srcs:
                     continue
@@ -45,8 +54,9 @@ class ZB_Scraper(ST_Scraper):
                 seen_srcs.add(src)
                 # optional figcaption if you ever wrap it
                 caption = None
-                if img.parent and img.parent.name.lower() == "figure":
-                    figcap = img.parent.find("figcaption")
+                parent = _img_parent(img)
+                if parent.name == "figure":
+                    figcap = parent.find("figcaption")
                     if figcap:
                         caption = figcap.get_text(strip=True)
 
@@ -58,73 +68,18 @@ class ZB_Scraper(ST_Scraper):
 
         return images    
 
-    async def scrape_single_url(self, url: str) -> Dict[str, Any]:
-        """Scrape a single URL for article content, metadata, images, and generate summary."""
-        logger.debug(f"Starting scrape for URL: {url}")
-        
-        try:
-            max_retries = 3
-            for attempt in range(max_retries):
-                soup = await self._fetch_page_content(url)
-                if soup and soup.find("article"):
-                    logger.info(f"Article successfully found {url}")
-                    break
-                logger.info(f"Retrying {url}")
-                
-            article = soup.find("article")
-            if not article:
-                logger.error(f"No <article> tag found in {url}")
-                raise RuntimeError("No <article> tag found")
-
-            # Title
-            h1 = article.find("h1")
-            title = (
-                h1.get_text(strip=True)
-                if h1
-                else (soup.title.string.strip() if soup.title else "(untitled)")
-            )
-
-            # ——— Published date (from the URL) ———
-            pub_date = None
-            m = re.search(r"story(\d{8})", url)
-            if m:
-                try:
-                    # parse “YYYYMMDD” into a date and iso-format it
-                    dt = dateparser.parse(m.group(1))
-                    pub_date = dt.date().isoformat()
-                except Exception:
-                    pub_date = None
-
-            # Extract and clean content
-            content = self._clean_content(article)
-
-            # Use custom image extraction method
-            images = self._extract_images(article, url)
-
-            return {
-                "article_url":   url,
-                "site_title":    title,
-                "publish_date":  pub_date,
-                "content":       content,
-                "images":        images,
-            }
-            
-        except Exception as e:
-            logger.error(f"Error scraping {url}: {e}", exc_info=True)
-            return ("ERROR", url, repr(e), traceback.format_exc())
-
-
-import concurrent.futures
-
-def process_single_file(txt_file: pathlib.Path, OUT_DIR, ERR_DIR, SEEN_DIR, CONCURRENCY):
-    try:
-        result = asyncio.run(process_txt_async(txt_file, OUT_DIR, ERR_DIR, CONCURRENCY, ZB_Scraper, False))
-        seen_path = SEEN_DIR / txt_file.name
-        txt_file.rename(seen_path)
-        return f"Processed {txt_file.name}"
-    except Exception as e:
-        logger.error(f"Error processing {txt_file}: {e}", exc_info=True)
-        return f"Error in {txt_file.name}: {e}"
+    def _extract_publish_date(self, soup: BeautifulSoup, article: Tag, url: str) -> Optional[str]:
+        # ——— Published date (from the URL) ———
+        m = _STORY_DATE_RE.search(url)
+        if m:
+            try:
+                # “YYYYMMDD” is fixed-width digits: build the date straight
+                # from the three groups (date() still rejects e.g. month 13)
+                return date(*map(int, m.groups())).isoformat()
+            except Exception:
+                pass
+        return None
+
 
 def main():
     BASE_DIR = pathlib.Path("/workspace/eefun/webscraping/sitemap/sitemap_scrape/data/zaobao")
@@ -148,14 +103,21 @@ def main():
 
     logger.info(f"Found {len(txt_files)} files to process")
 
-    with concurrent.futures.ProcessPoolExecutor(max_workers=MAX_PARALLEL_TXT_FILES) as executor:
-        futures = [
-            executor.submit(process_single_file, txt_file, OUT_DIR, ERR_DIR, SEEN_DIR, CONCURRENCY)
-            for txt_file in txt_files
-        ]
-        for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="Parallel processing"):
-            result = future.result()
-            logger.info(result)
+    # one event loop + one Chromium for every file, instead of a browser per
+    # worker process
+    aio.run(
+        process_files_async(
+            txt_files,
+            OUT_DIR,
+            ERR_DIR,
+            SEEN_DIR,
+            concurrency=CONCURRENCY,
+            file_parallel=MAX_PARALLEL_TXT_FILES,
+            scraper_class=ZB_Scraper,
+            ensure_ascii=False,
+            bloom_path=BASE_DIR / "seen.bf",
+        )
+    )
 
     logger.info("All files processed!")
 
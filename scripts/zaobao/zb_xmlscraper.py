@@ -6,14 +6,16 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Iterable, List
 import httpx
-from bs4 import BeautifulSoup
+from ..straits_times.xmlscraper import (
+    SitemapClientMixin, _iter_locs, _loc_pull_parser, _locs_from_events,
+)
 
 # match sitemap files like sitemap-1.xml, sitemap-2.xml, etc.
 SITEMAP_RE = re.compile(r"sitemap-(\d+)\.xml$")
 
 
 @dataclass
-class ZB_XMLScraper:
+class ZB_XMLScraper(SitemapClientMixin):
     index_url: str
     out_dir: Path | str = "./data/beritaharian"
     timeout: float = 15.0
@@ -26,41 +28,24 @@ class ZB_XMLScraper:
         self.out_dir = Path(self.out_dir)
         self.out_dir.mkdir(parents=True, exist_ok=True)
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            sitemap_urls = await self._sitemap_links(client)
-            if not sitemap_urls:
-                print("No sitemaps found.")
-                return
-
-            sem = asyncio.Semaphore(self.max_concurrency)
-            tasks = [
-                asyncio.create_task(self._process_sitemap(url, client, sem))
-                for url in sitemap_urls
-            ]
-            await asyncio.gather(*tasks)
+        client = self._get_client()
+        sitemap_urls = await self._sitemap_links(client)
+        if not sitemap_urls:
+            print("No sitemaps found.")
+            return
 
-    def dump(self):
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = None
-
-        if loop and loop.is_running():
-            return asyncio.create_task(self.dump_async())
-        else:
-            asyncio.run(self.dump_async())
+        sem = asyncio.Semaphore(self.max_concurrency)
+        tasks = [
+            asyncio.create_task(self._process_sitemap(url, client, sem))
+            for url in sitemap_urls
+        ]
+        await asyncio.gather(*tasks)
 
     async def _sitemap_links(self, client: httpx.AsyncClient) -> List[str]:
         """Return all sitemap URLs except sitemap-0.xml."""
         resp = await client.get(self.index_url)
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.content, "xml")
-
-        all_sitemaps = [
-            loc.text.strip()
-            for loc in soup.find_all("loc")
-            if loc.parent.name == "sitemap"
-        ]
+        all_sitemaps = list(_iter_locs(resp.content, parent="sitemap"))
         # filter out sitemap-0.xml
         filtered = [
             url for url in all_sitemaps
@@ -72,14 +57,21 @@ class ZB_XMLScraper:
         self, sitemap_url: str, client: httpx.AsyncClient
     ) -> Iterable[str]:
         """Fetch one sitemap-N.xml and yield each URL in its CDATA <loc>."""
-        resp = await client.get(sitemap_url)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.content, "xml")
-        # loc tags contain <![CDATA[ ... ]]>
-        for loc in soup.find_all("loc"):
-            url = loc.text.strip()
-            if url:
-                yield url
+        # parsed chunk by chunk as the body downloads, so the whole sitemap
+        # is never buffered and parsing overlaps the transfer
+        async with client.stream("GET", sitemap_url) as resp:
+            resp.raise_for_status()
+            parser = _loc_pull_parser()
+            async for chunk in resp.aiter_bytes():
+                parser.feed(chunk)
+                # loc tags contain <![CDATA[ ... ]]>, which lxml hands back as text
+                for url in _locs_from_events(parser.read_events()):
+                    if url:
+                        yield url
+            parser.close()
+            for url in _locs_from_events(parser.read_events()):
+                if url:
+                    yield url
 
     async def _process_sitemap(
         self, sitemap_url: str, client: httpx.AsyncClient, sem: asyncio.Semaphore
@@ -103,7 +95,8 @@ class ZB_XMLScraper:
 
             fname = f"{self.abbrev}_{idx}.txt"
             outpath = self.out_dir / fname
-            outpath.write_text("\n".join(urls), encoding="utf-8")
+            # written in a thread so the other downloads keep going meanwhile
+            await asyncio.to_thread(outpath.write_text, "\n".join(urls), encoding="utf-8")
 
             print(f"{len(urls):4d} URLs · {outpath.name}")
             await asyncio.sleep(self.polite_delay)
@@ -0,0 +1,13 @@
+import asyncio
+
+try:
+    import uvloop
+except ImportError:  # uvloop has no Windows build
+    uvloop = None
+
+
+def run(main):
+    """asyncio.run(main), on a uvloop event loop when uvloop is installed."""
+    if uvloop is not None:
+        return uvloop.run(main)
+    return asyncio.run(main)
@@ -0,0 +1,84 @@
+import math
+import pathlib
+import struct
+
+import xxhash
+
+# magic, bit count, hash count, items added
+_HEADER = struct.Struct("<4sQII")
+_MAGIC = b"BLM1"
+
+DEFAULT_CAPACITY = 5_000_000
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over str keys, used to skip article URLs that were
+    already scraped in an earlier run. Membership can give false positives at
+    roughly `error_rate` while under `capacity` items, never false negatives.
+    Past `capacity` the rate climbs quickly; rebuild it larger (see
+    `saturated`).
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, error_rate: float = 1e-6):
+        self.capacity = capacity
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: str):
+        # double hashing: k positions from the two halves of one 128-bit hash
+        h = xxhash.xxh3_128_intdigest(key.encode("utf-8"))
+        h1, h2 = h & 0xFFFFFFFFFFFFFFFF, (h >> 64) | 1
+        m = self.num_bits
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % m
+
+    def add(self, key: str) -> None:
+        bits = self.bits
+        for pos in self._positions(key):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    @property
+    def saturated(self) -> bool:
+        """More items added than the filter was sized for."""
+        return self.count > self.capacity
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        for pos in self._positions(key):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def tofile(self, path: pathlib.Path) -> None:
+        """Write the filter to `path` (via a temp file, so a crash can't truncate it)."""
+        path = pathlib.Path(path)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self.num_bits, self.num_hashes, self.count))
+            f.write(self.bits)
+        tmp.replace(path)
+
+    @classmethod
+    def fromfile(cls, path: pathlib.Path) -> "BloomFilter":
+        """Read a filter written by tofile(); ValueError if the file is corrupt."""
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError(f"{path} is truncated")
+            magic, num_bits, num_hashes, count = _HEADER.unpack(header)
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not a bloom filter file")
+            bits = bytearray(f.read())
+        if num_hashes < 1 or len(bits) != (num_bits + 7) // 8:
+            raise ValueError(
+                f"{path} has {len(bits)} bytes of bits, header says {(num_bits + 7) // 8}"
+            )
+        bf = cls.__new__(cls)
+        bf.num_bits, bf.num_hashes, bf.count = num_bits, num_hashes, count
+        bf.capacity = round(num_bits * math.log(2) / num_hashes)
+        bf.bits = bits
+        return bf
@@ -10,12 +10,17 @@ class CustomFormatter(logging.Formatter):
     simple_fmt = '[%(asctime)s] [%(levelname)s] %(message)s'
     error_fmt = '[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)d] %(message)s'
 
+    def __init__(self, datefmt=None):
+        super().__init__(self.simple_fmt, datefmt)
+        # one formatter per layout, picked per record: nothing shared is
+        # rewritten, so threads logging at once can't swap each other's format
+        self._simple = logging.Formatter(self.simple_fmt, datefmt)
+        self._error = logging.Formatter(self.error_fmt, datefmt)
+
     def format(self, record):
         if record.levelno >= logging.ERROR:
-            self._style._fmt = self.error_fmt
-        else:
-            self._style._fmt = self.simple_fmt
-        return super().format(record)
+            return self._error.format(record)
+        return self._simple.format(record)
 
 handler = logging.StreamHandler()
 handler.setFormatter(CustomFormatter(